@@ -0,0 +1,121 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""An on-disk cache of the results of checking files.
+
+The results are keyed by a hash of everything they depend on, the contents of
+the file first, so unchanged files are answered from the cache on later runs.
+The cache is an SQLite database, which several threads and processes can
+read and write at once; the entries used least recently are removed by
+prune() once there are more than its maximum size.
+"""
+
+from collections.abc import Iterable
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 10000
+# How long to wait for another writer before giving up, in seconds
+TIMEOUT = 30
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    used REAL NOT NULL
+)
+'''
+
+
+def make_key(content: bytes, parts: Iterable[str]) -> str:
+    """Return the key of the results for some file contents.
+
+    ``parts`` are everything else the results depend on.
+    """
+    digest = hashlib.sha256(content)
+    for part in parts:
+        digest.update(b'\0')
+        digest.update(part.encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """The results of checking files, stored in a directory.
+
+    Errors accessing the database are not raised: getting an entry then
+    misses, and storing one does nothing, as the files can always be checked
+    again instead.
+    """
+
+    def __init__(self, directory: str,
+                 max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = os.path.join(directory, 'results.sqlite')
+        self.directory = directory
+        self.max_entries = max_entries
+        # SQLite connections can only be used by the thread which made them
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=TIMEOUT,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Any:
+        """Return the entry of a key, or None if there is none."""
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                'SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE results SET used = ? WHERE key = ?',
+                               (time.time(), key))
+        except (OSError, sqlite3.Error):
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store an entry, which must be serializable as JSON."""
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time()))
+        except (OSError, sqlite3.Error):
+            pass
+
+    def prune(self) -> None:
+        """Remove the entries used least recently beyond the maximum size."""
+        try:
+            self._connect().execute(
+                'DELETE FROM results WHERE key IN ('
+                ' SELECT key FROM results ORDER BY used DESC'
+                ' LIMIT -1 OFFSET ?)', (self.max_entries,))
+        except (OSError, sqlite3.Error):
+            pass
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
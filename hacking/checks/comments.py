@@ -10,14 +10,15 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import functools
+import os
 import re
 import tokenize
+import warnings
 
+from hacking import config
 from hacking import core
-
-
-AUTHOR_TAG_RE = (re.compile(r"^\s*#\s*@?(a|A)uthors?:"),
-                 re.compile(r"^\.\.\s+moduleauthor::"))
+from hacking import project
 
 
 @core.flake8ext
@@ -46,92 +47,267 @@ def hacking_todo_format(physical_line, tokens):
                 return pos + start_index[1], "H101: Use TODO(NAME)"
 
 
-@core.flake8ext
-def hacking_has_license(physical_line, filename, lines, line_number):
-    """Check for Apache 2.0 license.
+# Default number of lines at the top of a file searched for its license
+# header, see the license_header_lines option
+HEADER_LINES = 50
+EMPTY_LINE_RE = re.compile(r"^\s*(#.*|$)")
+# Author tags, matched against a whole file: whitespace may not span lines
+AUTHOR_TAG_FILE_RE = re.compile(r"^[^\S\n]*#[^\S\n]*@?(a|A)uthors?:|"
+                                r"^\.\.[^\S\n]+moduleauthor::",
+                                re.MULTILINE)
+APACHE2 = """
+Licensed under the Apache License, Version 2.0 (the "License"); you may
+not use this file except in compliance with the License. You may obtain
+a copy of the License at
 
-    H102 license header not found
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations
+under the License."""
+# APACHE2 with the newlines and extra spaces stripped, see
+# _check_for_exact_apache
+STRIPPED_APACHE2 = ' '.join(APACHE2.split())
+SPDX_APACHE2 = 'SPDX-License-Identifier: Apache-2.0'
+
+
+@core.memoize_last
+def _check_file(lines, filename):
+    """Run all the file level comment checks.
+
+    These only need to look at a file once, rather than line by line, and
+    apart from author tags only ever look at its header.
+
+    Returns the (lineno, col_offset, message) errors found in the file.
     """
+    errors = []
+    # skip files that are < 10 lines, which isn't enough for a license to fit
+    # this allows us to handle empty files, as well as not fail on the Okay
+    # doctests.
     # don't work about init files for now
     # TODO(sdague): enforce license in init file if it's not empty of content
+    if len(lines) > 10 and _project_is_apache(filename):
+        errors.extend((1,) + error
+                      for error in _check_license(lines, filename))
+    if lines and all(map(EMPTY_LINE_RE.match, lines)):
+        errors.append((1, 0, "H104: File contains nothing but comments"))
+    errors.extend(_find_author_tags(''.join(lines)))
+    return errors
+
+
+def _get_header_lines(filename):
+    return _read_header_lines(core.get_config(filename))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_header_lines(conf):
+    header_lines = conf.get('license_header_lines')
+    if not header_lines:
+        return HEADER_LINES
+    try:
+        value = int(header_lines)
+    except ValueError:
+        value = 0
+    if value < 1:
+        warnings.warn(
+            "license_header_lines must be a positive number of lines, not "
+            "%r; using %d" % (header_lines, HEADER_LINES), UserWarning)
+        return HEADER_LINES
+    return value
+
+
+def _check_license(lines, filename):
+    """Check the license header of a file for H102 and H103.
+
+    Only the header of the file is searched, and an Apache-2.0 SPDX
+    identifier is enough for both checks without looking at the notice.
+    """
+    header = lines[:_get_header_lines(filename)]
+    if any(SPDX_APACHE2 in line for line in header):
+        return []
+
+    errors = []
     license_found = False
+    notice_matches = True
+    for idx, line in enumerate(header):
+        # if it's more than 10 characters in, it's probably not in the
+        # header
+        if 0 <= line.find('SPDX-License-Identifier:') < 10:
+            license_found = True
+        column = line.find('Licensed under the Apache License')
+        if 0 <= column < 10:
+            license_found = True
+            # every notice is compared, as a header may have been pasted in
+            # twice, but only the first which does not match is reported
+            if column > 0 and notice_matches:
+                exact, cmp_str = _check_for_exact_apache(idx, lines)
+                if not exact:
+                    notice_matches = False
+                    errors.append((column, "H103: Header does not match "
+                                   "Apache 2.0 License notice" + cmp_str))
+    if not license_found:
+        errors.append((0, "H102: Apache 2.0 license header not found"))
+    return errors
+
+
+def _find_author_tags(text):
+    lineno = 1
+    last = 0
+    for match in AUTHOR_TAG_FILE_RE.finditer(text):
+        start = match.start()
+        lineno += text.count('\n', last, start)
+        last = start
+        end = text.find('\n', start)
+        line = text[start:end if end >= 0 else len(text)].lower()
+        pos = line.find('moduleauthor')
+        if pos < 0:
+            pos = line.find('author')
+        yield (lineno, pos, "H105: Don't use author tags")
+
+
+class FileCommentsCheck(object):
+    """Base class for the checks on the comments of a whole file
+
+    The checks only differ by the code they report; the file is scanned once
+    for all of them.
+    """
 
-    # skip files that are < 10 lines, which isn't enough for a license to fit
-    # this allows us to handle empty files, as well as not fail on the Okay
-    # doctests.
-    if line_number == 1 and len(lines) > 10 and _project_is_apache():
-        for idx, line in enumerate(lines):
-            # if it's more than 10 characters in, it's probably not in the
-            # header
-            if 0 <= line.find('Licensed under the Apache License') < 10:
-                license_found = True
-            if 0 <= line.find('SPDX-License-Identifier:') < 10:
-                license_found = True
-        if not license_found:
-            return (0, "H102: Apache 2.0 license header not found")
+    name = "file_comments_check"
+    version = "1.00"
+    code = ''
+
+    def __init__(self, tree, filename, lines):
+        self.filename = filename
+        self.lines = lines
+
+    def run(self):
+        for lineno, col_offset, message in _check_file(self.lines,
+                                                       self.filename):
+            if message.startswith(self.code):
+                yield lineno, col_offset, message, type(self)
 
 
 @core.flake8ext
-def hacking_has_correct_license(physical_line, filename, lines, line_number):
+class HasLicenseCheck(FileCommentsCheck):
+    """Check for Apache 2.0 license.
+
+    H102 license header not found
+    """
+
+    code = 'H102'
+
+
+@core.flake8ext
+class HasCorrectLicenseCheck(FileCommentsCheck):
     """Check for Apache 2.0 license.
 
     H103 header does not match Apache 2.0 License notice
     """
-    # don't work about init files for now
-    # TODO(sdague): enforce license in init file if it's not empty of content
 
-    # skip files that are < 10 lines, which isn't enough for a license to fit
-    # this allows us to handle empty files, as well as not fail on the Okay
-    # doctests.
-    if line_number == 1 and len(lines) > 10 and _project_is_apache():
-        for idx, line in enumerate(lines):
-            column = line.find('Licensed under the Apache License')
-            if 0 < column < 10:
-                exact, cmp_str = _check_for_exact_apache(idx, lines)
-                if (not exact and
-                        line.find('SPDX-License-Identifier: Apache-2.0') <= 0):
-                    return (column, "H103: Header does not match Apache 2.0 "
-                            "License notice" + cmp_str)
+    code = 'H103'
 
 
-EMPTY_LINE_RE = re.compile(r"^\s*(#.*|$)")
+@core.flake8ext
+class OnlyCommentsCheck(FileCommentsCheck):
+    """Check for empty files with only comments
+
+    H104 empty file with only comments
+    """
+
+    code = 'H104'
 
 
 @core.flake8ext
+class NoAuthorTagsCheck(FileCommentsCheck):
+    """Check that no author tags are used.
+
+    H105 don't use author tags
+    """
+
+    code = 'H105'
+
+
+# The physical line checks H102 to H105 used to be run as. They are no longer
+# registered with flake8, but are kept for the projects importing them.
+
+def _check_first_line(lines, filename, line_number, code):
+    if line_number != 1:
+        return None
+    for _, col_offset, message in _check_file(lines, filename):
+        if message.startswith(code):
+            return col_offset, message
+    return None
+
+
+def hacking_has_license(physical_line, filename, lines, line_number):
+    """Check for Apache 2.0 license.
+
+    Deprecated, HasLicenseCheck runs H102 once per file.
+    """
+    return _check_first_line(lines, filename, line_number, 'H102')
+
+
+def hacking_has_correct_license(physical_line, filename, lines, line_number):
+    """Check for Apache 2.0 license.
+
+    Deprecated, HasCorrectLicenseCheck runs H103 once per file.
+    """
+    return _check_first_line(lines, filename, line_number, 'H103')
+
+
 def hacking_has_only_comments(physical_line, filename, lines, line_number):
     """Check for empty files with only comments
 
-    H104 empty file with only comments
+    Deprecated, OnlyCommentsCheck runs H104 once per file.
     """
-    if line_number == 1 and all(map(EMPTY_LINE_RE.match, lines)):
-        return (0, "H104: File contains nothing but comments")
+    return _check_first_line(lines, filename, line_number, 'H104')
 
 
-_is_apache_cache = None
+def hacking_no_author_tags(physical_line):
+    """Check that no author tags are used.
+
+    Deprecated, NoAuthorTagsCheck runs H105 once per file.
+    """
+    for _, pos, message in _find_author_tags(physical_line):
+        return pos, message
+    return None
+
+
+# Files looked at to figure out the license of a project, and how much of each
+# is read: the license name comes first.
+LICENSE_FILES = ("LICENSE",)
+LICENSE_READ_SIZE = 64 * 1024
 
 
-def _project_is_apache():
+@project.file_fact
+def _project_is_apache(filename=None):
     """Determine if a project is Apache.
 
     Look for a key string in a set of possible license files to figure out
     if a project looks to be Apache. This is used as a precondition for
     enforcing license headers.
+
+    The license files are the ones of the nearest directory above the file
+    holding any, up to the root of its repository, so that a subproject
+    without a license of its own gets the license of its repository. See
+    hacking.config.find_nearest_directory.
     """
+    directory = config.find_nearest_directory(filename, LICENSE_FILES)
+    return directory is not None and _license_is_apache(directory)
+
 
-    global _is_apache_cache
-    if _is_apache_cache is not None:
-        return _is_apache_cache
-    license_files = ["LICENSE"]
-    for filename in license_files:
+@functools.lru_cache(maxsize=None)
+def _license_is_apache(directory):
+    for filename in LICENSE_FILES:
         try:
-            with open(filename, "r") as file:
-                for line in file:
-                    if re.search('Apache License', line):
-                        _is_apache_cache = True
-                        return True
+            with open(os.path.join(directory, filename), "r",
+                      errors="replace") as file:
+                if 'Apache License' in file.read(LICENSE_READ_SIZE):
+                    return True
         except IOError:
             pass
-    _is_apache_cache = False
     return False
 
 
@@ -141,45 +317,15 @@ def _check_for_exact_apache(start, lines):
     We strip all the newlines and extra spaces so this license string
     should work regardless of indentation in the file.
     """
-    APACHE2 = """
-Licensed under the Apache License, Version 2.0 (the "License"); you may
-not use this file except in compliance with the License. You may obtain
-a copy of the License at
-
-http://www.apache.org/licenses/LICENSE-2.0
-
-Unless required by applicable law or agreed to in writing, software
-distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
-WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
-License for the specific language governing permissions and limitations
-under the License."""
-
     # out of all the formatting I've seen, a 12 line version seems to be the
     # longest in the source tree. So just take the 12 lines starting with where
     # the Apache starting words were found, strip all the '#' and collapse the
     # spaces.
     content = ''.join(lines[start:(start + 12)])
-    content = re.sub(r'\#', '', content)
-    content = re.sub(r'\s+', ' ', content).strip()
-    stripped_apache2 = re.sub(r'\s+', ' ', APACHE2).strip()
+    content = ' '.join(content.replace('#', '').split())
 
-    if stripped_apache2 in content:
+    if STRIPPED_APACHE2 in content:
         return (True, None)
     else:
         return (False, "\n<license>!=<apache2>:\n'%s' !=\n'%s'" %
-                       (content, stripped_apache2))
-
-
-@core.flake8ext
-def hacking_no_author_tags(physical_line):
-    """Check that no author tags are used.
-
-    H105 don't use author tags
-    """
-    for regex in AUTHOR_TAG_RE:
-        if regex.match(physical_line):
-            physical_line = physical_line.lower()
-            pos = physical_line.find('moduleauthor')
-            if pos < 0:
-                pos = physical_line.find('author')
-            return (pos, "H105: Don't use author tags")
+                       (content, STRIPPED_APACHE2))
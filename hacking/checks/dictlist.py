@@ -22,6 +22,7 @@ LOCALS_TEXT_MAP = {
 
 
 @core.flake8ext
+@core.triggers('locals()', 'self.__dict__')
 def hacking_no_locals(logical_line, tokens, noqa):
     """Do not use locals() or self.__dict__ for string formatting.
 
@@ -10,6 +10,8 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import collections
+import functools
 import tokenize
 
 from hacking import core
@@ -17,6 +19,11 @@ from hacking import core
 START_DOCSTRING_TRIPLE = ['u"""', 'r"""', '"""', "u'''", "r'''", "'''"]
 END_DOCSTRING_TRIPLE = ['"""', "'''"]
 
+# A docstring split up once for all the checks below: start_triple is the
+# opening quotes (with any prefix) and lines the lines of the docstring.
+Docstring = collections.namedtuple('Docstring',
+                                   ['text', 'start_triple', 'lines'])
+
 
 @core.flake8ext
 def hacking_docstring_start_space(physical_line, previous_logical, tokens):
@@ -32,10 +39,9 @@ def hacking_docstring_start_space(physical_line, previous_logical, tokens):
     H401: def foo():\n    ''' This is not.'''
     H401: def foo():\n    r''' This is not.'''
     """
-    docstring = is_docstring(tokens, previous_logical)
+    docstring = get_docstring(tokens, previous_logical)
     if docstring:
-        start, start_triple = _find_first_of(docstring, START_DOCSTRING_TRIPLE)
-        if docstring[len(start_triple)] == ' ':
+        if docstring.text[len(docstring.start_triple)] == ' ':
             # docstrings get tokenized on the last line of the docstring, so
             # we don't know the exact position.
             return (0, "H401: docstring should not start with"
@@ -59,13 +65,13 @@ def hacking_docstring_multiline_end(physical_line, previous_logical, tokens):
     H403: def foo():\n    '''foobar\nfoo\nbar\npretend raw: r'''
     H403: class Foo(object):\n    '''foobar\nfoo\nbar\ndocstring'''\n\n
     """
-    docstring = is_docstring(tokens, previous_logical)
+    docstring = get_docstring(tokens, previous_logical)
     if docstring:
-        if '\n' not in docstring:
+        if len(docstring.lines) == 1:
             # not a multi line
             return
         else:
-            last_line = docstring.split('\n')[-1]
+            last_line = docstring.lines[-1]
         pos = max(last_line.rfind(i) for i in END_DOCSTRING_TRIPLE)
         if len(last_line[:pos].strip()) > 0:
             # Something before the end docstring triple
@@ -85,14 +91,12 @@ def hacking_docstring_multiline_start(physical_line, previous_logical, tokens):
     H404: def foo():\n    '''\nfoo\nbar\n'''\n\n
     H404: def foo():\n    r'''\nfoo\nbar\n'''\n\n
     """
-    docstring = is_docstring(tokens, previous_logical)
+    docstring = get_docstring(tokens, previous_logical)
     if docstring:
-        if '\n' not in docstring:
+        if len(docstring.lines) == 1:
             # single line docstring
             return
-        start, start_triple = _find_first_of(docstring, START_DOCSTRING_TRIPLE)
-        lines = docstring.split('\n')
-        if lines[0].strip() == start_triple:
+        if docstring.lines[0].strip() == docstring.start_triple:
             # docstrings get tokenized on the last line of the docstring, so
             # we don't know the exact position.
             return (0, "H404: multi line docstring "
@@ -112,13 +116,12 @@ def hacking_docstring_summary(physical_line, previous_logical, tokens):
     H405: def foo():\n    r'''foobar\nfoo\nbar\n'''
     H405: def foo():\n    '''foobar\n'''
     """
-    docstring = is_docstring(tokens, previous_logical)
+    docstring = get_docstring(tokens, previous_logical)
     if docstring:
-        if '\n' not in docstring:
+        if len(docstring.lines) == 1:
             # not a multi line docstring
             return
-        lines = docstring.split('\n')
-        if len(lines) > 1 and len(lines[1].strip()) != 0:
+        if len(docstring.lines[1].strip()) != 0:
             # docstrings get tokenized on the last line of the docstring, so
             # we don't know the exact position.
             return (0, "H405: multi line docstring "
@@ -132,19 +135,39 @@ def is_docstring(tokens, previous_logical):
     module, function, class,'
     http://www.python.org/dev/peps/pep-0257/#what-is-a-docstring
     """
+    docstring = get_docstring(tokens, previous_logical)
+    if docstring is None:
+        return False
+    return docstring.text
+
+
+def get_docstring(tokens, previous_logical):
+    """Return the found docstring as a Docstring, or None
+
+    flake8 runs the physical line checks on every line of a multi line
+    docstring, so the docstring is split up once and reused by each check
+    and each line.
+    """
     for token_type, text, start, _, _ in tokens:
         if token_type == tokenize.STRING:
             break
         elif token_type != tokenize.INDENT:
-            return False
+            return None
     else:
-        return False
+        return None
+    if not (previous_logical.startswith("def ") or
+            previous_logical.startswith("class ")):
+        return None
+    return _split_docstring(text)
+
+
+@functools.lru_cache(maxsize=1)
+def _split_docstring(text):
     line = text.lstrip()
     start, start_triple = _find_first_of(line, START_DOCSTRING_TRIPLE)
-    if (previous_logical.startswith("def ") or
-            previous_logical.startswith("class ")):
-        if start == 0:
-            return text
+    if start != 0:
+        return None
+    return Docstring(text, start_triple, text.split('\n'))
 
 
 def _find_first_of(line, substrings):
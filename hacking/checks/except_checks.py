@@ -13,20 +13,22 @@
 # module cannot be called except since that is a reserved word
 
 import ast
+import functools
 import re
 
 from hacking import core
 
 RE_ASSERT_RAISES_EXCEPTION = re.compile(r"self\.assertRaises\(Exception[,\)]")
+# NOTE: the patterns below start with a literal and only use character
+#       classes that cannot match the text following them, so they match in
+#       time linear in the length of the line.
 RE_ASSERT_TRUE_INST = re.compile(
-    r"(.)*assertTrue\(isinstance\((\w|\.|\'|\"|\[|\])+, "
-    r"(\w|\.|\'|\"|\[|\])+\)\)")
+    r"assertTrue\(isinstance\([\w.'\"\[\]]+, [\w.'\"\[\]]+\)\)")
 RE_ASSERT_EQUAL_TYPE = re.compile(
-    r"(.)*assertEqual\(type\((\w|\.|\'|\"|\[|\])+\), "
-    r"(\w|\.|\'|\"|\[|\])+\)")
+    r"assertEqual\(type\([\w.'\"\[\]]+\), [\w.'\"\[\]]+\)")
 RE_ASSERT_EQUAL_IN_START_WITH_TRUE_OR_FALSE = re.compile(
     r"assertEqual\("
-    r"(True|False), (\w|[][.'\"])+ in (\w|[][.'\", ])+\)")
+    r"(?:True|False), [\w\][.'\"]+ in [\w\][.'\", ]+\)")
 RE_ASSERT_RAISES_REGEXP = re.compile(r"assertRaisesRegexp\(")
 # NOTE(snikitin): Next two regexes weren't united to one for more readability.
 #                 asse_true_false_with_in_or_not_in regex checks
@@ -39,19 +41,74 @@ RE_ASSERT_RAISES_REGEXP = re.compile(r"assertRaisesRegexp\(")
 #                 with [, ", '. Otherwise checking of string
 #                 "assertFalse(A in B and C in D)" will be false positives.
 #                 In this case B argument is "B and C in D".
+#                 Both only match up to the ")" or ", " following B; a
+#                 message argument only needs a ")" somewhere after it, which
+#                 scan_line() checks without going back over the line.
 RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN = re.compile(
-    r"assert(True|False)\("
-    r"(\w|[][.'\"])+( not)? in (\w|[][.'\",])+(, .*)?\)")
+    r"assert(?:True|False)\("
+    r"[\w\][.'\"]+(?: not)? in [\w\][.'\",]+(?:\)|, )")
 RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN_SPACES = re.compile(
-    r"assert(True|False)"
-    r"\((\w|[][.'\"])+( not)? in [\[|'|\"](\w|[][.'\", ])+"
-    r"[\[|'|\"](, .*)?\)")
+    r"assert(?:True|False)"
+    r"\([\w\][.'\"]+(?: not)? in [\[|'\"][\w\][.'\", ]+"
+    r"[\[|'\"](?:\)|, )")
 RE_ASSERT_EQUAL_IN_END_WITH_TRUE_OR_FALSE = re.compile(
     r"assertEqual\("
-    r"(\w|[][.'\"])+ in (\w|[][.'\", ])+, (True|False)\)")
+    r"[\w\][.'\"]+ in [\w\][.'\", ]+, (?:True|False)\)")
+RE_LOG_WARN = re.compile(r"LOG\.warn\(")
+
+
+def _scanner_branch(name, pattern):
+    # Factor out the "assert" every assertion pattern has, so that the
+    # scanner only tries its branches where "assert" is found, and check
+    # what comes before it with a lookbehind.
+    prefix, _, rest = pattern.pattern.partition('assert')
+    if prefix:
+        rest = '(?<=%sassert)%s' % (prefix, rest)
+    return '(?P<%s>%s)' % (name, rest)
+
+
+# All of the patterns above in one scanner, each in a group named after the
+# code it reports. None of them can match inside a match of another, so a
+# single finditer() over the line finds all of them.
+RE_LINE_SCANNER = re.compile('(?P<H906>%s)|assert(?:%s)' % (
+    RE_LOG_WARN.pattern,
+    '|'.join(_scanner_branch(name, pattern) for name, pattern in (
+        ('H202', RE_ASSERT_RAISES_EXCEPTION),
+        ('H211', RE_ASSERT_TRUE_INST),
+        ('H212', RE_ASSERT_EQUAL_TYPE),
+        ('H213', RE_ASSERT_RAISES_REGEXP),
+        ('H214', RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN),
+        ('H214_spaces', RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN_SPACES),
+        ('H215_start', RE_ASSERT_EQUAL_IN_START_WITH_TRUE_OR_FALSE),
+        ('H215_end', RE_ASSERT_EQUAL_IN_END_WITH_TRUE_OR_FALSE),
+    ))))
+
+
+@functools.lru_cache(maxsize=1)
+def scan_line(logical_line):
+    """Return the codes of all the scanner patterns found in a line.
+
+    The checks using the scanner run one after the other on the same
+    logical line, so only the last line is cached.
+    """
+    if 'assert' not in logical_line and 'LOG.warn(' not in logical_line:
+        return frozenset()
+    found = set()
+    last_paren = None
+    for match in RE_LINE_SCANNER.finditer(logical_line):
+        code = match.lastgroup[:4]
+        if code == 'H214' and not match.group().endswith(')'):
+            # a message follows B, which only needs a ")" after it
+            if last_paren is None:
+                last_paren = logical_line.rfind(')')
+            if last_paren < match.end():
+                continue
+        found.add(code)
+    return frozenset(found)
 
 
 @core.flake8ext
+@core.triggers('except:')
 def hacking_except_format(logical_line, noqa):
     r"""Check for 'except:'.
 
@@ -84,7 +141,7 @@ def hacking_except_format_assert(logical_line, noqa):
     """
     if noqa:
         return
-    if RE_ASSERT_RAISES_EXCEPTION.search(logical_line):
+    if 'H202' in scan_line(logical_line):
         yield 1, "H202: assertRaises Exception too broad"
 
 
@@ -102,32 +159,193 @@ def _get_local_func_name(node):
         return None
 
 
-class NoneArgChecker(ast.NodeVisitor):
-    '''NodeVisitor to check function calls for None arguments.
+# Methods whose first two arguments should not be None (H203)
+NONE_ARG_METHODS = ('assertEqual', 'assertIs', 'assertNotEqual',
+                    'assertIsNot')
+# Methods that should not be passed a bare comparison (H204/H205)
+TRUE_FALSE_METHODS = ('assertTrue', 'assertFalse')
+EQUAL_OPS = (ast.Eq, ast.NotEq)
+GREATER_LESS_OPS = (ast.Gt, ast.GtE, ast.Lt, ast.LtE)
+
+
+class AssertionCallChecker(ast.NodeVisitor):
+    '''NodeVisitor finding the H203, H204 and H205 violations in a module.
 
-    :param func_name: only check calls to functions with this name
-    :param num_args:  number of arguments to check for None
+    The module is gone through one logical line at a time, the way these
+    checks used to run: statements joined by semicolons are one line, the
+    body of a compound statement is part of its header when written on the
+    same line, and the lines which do not parse on their own (decorators,
+    the headers of try, match and the blocks following them, and the
+    headers of compound statements with their body on the next lines) are
+    skipped. Each code is reported at most once per logical line, at the
+    first call of the method it was looked for at.
 
-    self.none_found will be True if any None arguments were found.
+    self.errors will hold (lineno, col_offset, message) tuples.
     '''
 
-    def __init__(self, func_name, num_args=2):
-        self.func_name = func_name
-        self.num_args = num_args
-        self.none_found = False
+    # The compound statements whose header and body on the same line parse
+    HEADER_STATEMENTS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With,
+                         ast.AsyncWith, ast.FunctionDef, ast.AsyncFunctionDef,
+                         ast.ClassDef)
+    # The fields of compound statements which are not part of their header
+    BLOCK_FIELDS = ('body', 'orelse', 'handlers', 'finalbody', 'cases',
+                    'decorator_list')
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.errors = []
+        self._anchors = {}
+        self._found = set()
+
+    def _line_start(self, node):
+        """Return what comes before a node on its first line."""
+        return self.lines[node.lineno - 1].encode('utf-8')[:node.col_offset]
+
+    def _is_inline(self, body):
+        return bool(self._line_start(body[0]).strip())
+
+    def _is_elif(self, orelse):
+        return (len(orelse) == 1 and isinstance(orelse[0], ast.If) and
+                not self._line_start(orelse[0]).strip() and
+                self.lines[orelse[0].lineno - 1].encode('utf-8')[
+                    orelse[0].col_offset:].startswith(b'elif'))
+
+    def check(self, tree):
+        self._visit_block(tree.body)
+
+    def _visit_block(self, body):
+        if not body or self._is_inline(body):
+            # the body of a header that does not parse on its own
+            return
+        line = []
+        for statement in body:
+            if line and statement.lineno != line[-1].end_lineno:
+                self._visit_line(line)
+                line = []
+            if hasattr(statement, 'body') or hasattr(statement, 'cases'):
+                self._visit_compound(statement)
+            else:
+                line.append(statement)
+        if line:
+            self._visit_line(line)
+
+    def _visit_compound(self, node):
+        if (isinstance(node, self.HEADER_STATEMENTS) and
+                self._is_inline(node.body)):
+            self._visit_line([node])
+        else:
+            self._visit_block(getattr(node, 'body', ()))
+        for handler in getattr(node, 'handlers', ()):
+            self._visit_block(handler.body)
+        for case in getattr(node, 'cases', ()):
+            self._visit_block(case.body)
+        orelse = getattr(node, 'orelse', ())
+        while isinstance(node, ast.If) and self._is_elif(orelse):
+            # elif headers do not parse on their own
+            node = orelse[0]
+            self._visit_block(node.body)
+            orelse = node.orelse
+        self._visit_block(orelse)
+        self._visit_block(getattr(node, 'finalbody', ()))
+
+    def _visit_line(self, statements):
+        self._anchors.clear()
+        self._found.clear()
+        for statement in statements:
+            if isinstance(statement, self.HEADER_STATEMENTS):
+                # a compound statement with its body on the same line
+                for field, value in ast.iter_fields(statement):
+                    if field in ('orelse', 'decorator_list'):
+                        continue
+                    for node in value if isinstance(value, list) else [value]:
+                        if isinstance(node, ast.AST):
+                            self.visit(node)
+            else:
+                self.visit(statement)
+        for key, message in self._found:
+            if key in ('H204', 'H205'):
+                position = (self._anchors.get('assertTrue') or
+                            self._anchors.get('assertFalse'))
+            else:
+                position = self._anchors.get(key)
+            if position is not None:
+                lineno, col_offset = position
+                line = self.lines[lineno - 1].encode('utf-8')
+                col_offset = len(line[:col_offset].decode('utf-8', 'ignore'))
+                self.errors.append((lineno, col_offset, message))
+
+    def _anchor(self, key, node):
+        position = (node.end_lineno, node.end_col_offset - len(node.attr))
+        if key not in self._anchors or position < self._anchors[key]:
+            self._anchors[key] = position
+
+    def visit_Attribute(self, node):
+        # H204 and H205 were reported at the first ".assertTrue" of the
+        # line, or the first ".assertFalse" if there was none.
+        if node.attr.startswith('assertTrue'):
+            self._anchor('assertTrue', node)
+        elif node.attr.startswith('assertFalse'):
+            self._anchor('assertFalse', node)
+        self.generic_visit(node)
 
     def visit_Call(self, node):
-        local_func_name = _get_local_func_name(node)
-
-        if local_func_name == self.func_name:
-            args_to_check = node.args[:self.num_args]
-            self.none_found |= any(is_none(x) for x in args_to_check)
+        if (isinstance(node.func, ast.Attribute) and
+                node.func.attr in NONE_ARG_METHODS):
+            self._anchor(node.func.attr, node.func)
+        method = _get_local_func_name(node)
+        if method in NONE_ARG_METHODS:
+            if any(is_none(x) for x in node.args[:2]):
+                self._found.add(
+                    (method, "H203: Use assertIs(Not)None to check for None"))
+        elif (method in TRUE_FALSE_METHODS and
+                len(node.args) == 1 and
+                isinstance(node.args[0], ast.Compare) and
+                len(node.args[0].ops) == 1):
+            if isinstance(node.args[0].ops[0], EQUAL_OPS):
+                self._found.add(('H204', 'H204: Use assert(Not)Equal()'))
+            elif isinstance(node.args[0].ops[0], GREATER_LESS_OPS):
+                self._found.add(
+                    ('H205', 'H205: Use assert{Greater,Less}[Equal]'))
         self.generic_visit(node)
 
 
-@core.flake8ext
+@core.memoize_last
+def _check_assertion_calls(tree, lines):
+    """Find the H203/H204/H205 violations with a single pass over the tree.
+
+    The result is shared by all three checks run against the same file.
+    """
+    checker = AssertionCallChecker(lines)
+    checker.check(tree)
+    checker.errors.sort()
+    return checker.errors
+
+
+class AssertionStyleCheck(object):
+    """Base class for checks on the style of unittest assertions
+
+    The checks only differ by the code they report; the module is walked once
+    for all of them.
+    """
+
+    name = "assertion_style_check"
+    version = "1.00"
+    code = ''
+
+    def __init__(self, tree, lines):
+        self.tree = tree
+        self.lines = lines
+
+    def run(self):
+        for lineno, col_offset, message in _check_assertion_calls(
+                self.tree, self.lines):
+            if message.startswith(self.code):
+                yield lineno, col_offset, message, type(self)
+
+
 @core.off_by_default
-def hacking_assert_is_none(logical_line, noqa):
+@core.flake8ext
+class AssertIsNoneCheck(AssertionStyleCheck):
     """Use assertIs(Not)None to check for None in assertions.
 
     Okay: self.assertEqual('foo', 'bar')
@@ -144,59 +362,13 @@ def hacking_assert_is_none(logical_line, noqa):
     Okay: self.assertIs(None, 'foo')  # noqa
     Okay: self.assertIsNone('foo')
     """
-    if noqa:
-        return
-    for func_name in ('assertEqual', 'assertIs', 'assertNotEqual',
-                      'assertIsNot'):
-        try:
-            start = logical_line.index('.%s(' % func_name) + 1
-        except ValueError:
-            continue
-        checker = NoneArgChecker(func_name)
-        try:
-            parsed_logical_line = ast.parse(logical_line)
-        except SyntaxError:
-            # let flake8 catch this itself
-            # https://github.com/PyCQA/flake8/issues/1948
-            continue
-        checker.visit(parsed_logical_line)
-        if checker.none_found:
-            yield start, "H203: Use assertIs(Not)None to check for None"
-
-
-class AssertTrueFalseChecker(ast.NodeVisitor):
-    '''NodeVisitor to find "assert[True|False](some comparison)" statements.
-
-    :param method_names: methods to look for: assertTrue and/or assertFalse
-    :param ops: list of comparisons we want to look for (objects from the ast
-                module)
-    '''
 
-    def __init__(self, method_names, ops):
-        self.method_names = method_names
-        self.ops = tuple(ops)
-        self.error = False
+    code = 'H203'
 
-    def visit_Call(self, node):
-        # No need to keep visiting the AST if we already found something.
-        if self.error:
-            return
-
-        self.generic_visit(node)
 
-        local_func_name = _get_local_func_name(node)
-
-        if (local_func_name in self.method_names and
-                len(node.args) == 1 and
-                isinstance(node.args[0], ast.Compare) and
-                len(node.args[0].ops) == 1 and
-                isinstance(node.args[0].ops[0], self.ops)):
-            self.error = True
-
-
-@core.flake8ext
 @core.off_by_default
-def hacking_assert_equal(logical_line, noqa):
+@core.flake8ext
+class AssertEqualCheck(AssertionStyleCheck):
     r"""Check that self.assertEqual and self.assertNotEqual are used.
 
     Okay: self.assertEqual(x, y)
@@ -206,32 +378,13 @@ def hacking_assert_equal(logical_line, noqa):
     H204: self.assertFalse(x == y)
     H204: self.assertFalse(x != y)
     """
-    if noqa:
-        return
 
-    methods = ['assertTrue', 'assertFalse']
-    for method in methods:
-        start = logical_line.find('.%s' % method) + 1
-        if start != 0:
-            break
-    else:
-        return
-    comparisons = [ast.Eq, ast.NotEq]
-    checker = AssertTrueFalseChecker(methods, comparisons)
-    try:
-        parsed_logical_line = ast.parse(logical_line)
-    except SyntaxError:
-        # let flake8 catch this itself
-        # https://github.com/PyCQA/flake8/issues/1948
-        return
-    checker.visit(parsed_logical_line)
-    if checker.error:
-        yield start, 'H204: Use assert(Not)Equal()'
+    code = 'H204'
 
 
-@core.flake8ext
 @core.off_by_default
-def hacking_assert_greater_less(logical_line, noqa):
+@core.flake8ext
+class AssertGreaterLessCheck(AssertionStyleCheck):
     r"""Check that self.assert{Greater,Less}[Equal] are used.
 
     Okay: self.assertGreater(x, y)
@@ -243,27 +396,54 @@ def hacking_assert_greater_less(logical_line, noqa):
     H205: self.assertTrue(x < y)
     H205: self.assertTrue(x <= y)
     """
-    if noqa:
-        return
 
-    methods = ['assertTrue', 'assertFalse']
-    for method in methods:
-        start = logical_line.find('.%s' % method) + 1
-        if start != 0:
-            break
-    else:
+    code = 'H205'
+
+
+# The logical line checks H203, H204 and H205 used to be run as. They are no
+# longer registered with flake8, but are kept for the projects importing them.
+
+def _check_assertion_line(logical_line, noqa, code):
+    if noqa:
         return
-    comparisons = [ast.Gt, ast.GtE, ast.Lt, ast.LtE]
-    checker = AssertTrueFalseChecker(methods, comparisons)
     try:
-        parsed_logical_line = ast.parse(logical_line)
+        tree = ast.parse(logical_line)
     except SyntaxError:
         # let flake8 catch this itself
         # https://github.com/PyCQA/flake8/issues/1948
         return
-    checker.visit(parsed_logical_line)
-    if checker.error:
-        yield start, 'H205: Use assert{Greater,Less}[Equal]'
+    checker = AssertionCallChecker([logical_line])
+    checker.check(tree)
+    for _, col_offset, message in sorted(checker.errors):
+        if message.startswith(code):
+            yield col_offset, message
+
+
+@core.off_by_default
+def hacking_assert_is_none(logical_line, noqa):
+    """Use assertIs(Not)None to check for None in assertions.
+
+    Deprecated, AssertIsNoneCheck runs H203 on the whole file.
+    """
+    return _check_assertion_line(logical_line, noqa, 'H203')
+
+
+@core.off_by_default
+def hacking_assert_equal(logical_line, noqa):
+    """Check that self.assertEqual and self.assertNotEqual are used.
+
+    Deprecated, AssertEqualCheck runs H204 on the whole file.
+    """
+    return _check_assertion_line(logical_line, noqa, 'H204')
+
+
+@core.off_by_default
+def hacking_assert_greater_less(logical_line, noqa):
+    """Check that self.assert{Greater,Less}[Equal] are used.
+
+    Deprecated, AssertGreaterLessCheck runs H205 on the whole file.
+    """
+    return _check_assertion_line(logical_line, noqa, 'H205')
 
 
 @core.flake8ext
@@ -272,19 +452,20 @@ def hacking_assert_true_instance(logical_line):
 
     H211
     """
-    if RE_ASSERT_TRUE_INST.match(logical_line):
+    if 'H211' in scan_line(logical_line):
         yield (
             0,
             "H211: Use assert{Is,IsNot}instance")
 
 
 @core.flake8ext
+@core.reports('H211')
 def hacking_assert_equal_type(logical_line):
     """Check for assertEqual(type(A), B) sentences
 
     H212
     """
-    if RE_ASSERT_EQUAL_TYPE.match(logical_line):
+    if 'H212' in scan_line(logical_line):
         yield (
             0,
             "H211: Use assert{Is,IsNot}instance")
@@ -296,8 +477,7 @@ def hacking_assert_raises_regexp(logical_line):
 
     H213
     """
-    res = RE_ASSERT_RAISES_REGEXP.search(logical_line)
-    if res:
+    if 'H213' in scan_line(logical_line):
         yield (
             0,
             "H213: assertRaisesRegex must be used instead "
@@ -312,10 +492,7 @@ def hacking_assert_true_or_false_with_in(logical_line):
     sentences.
     H214
     """
-    res = (RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN.search(logical_line)
-           or RE_ASSERT_TRUE_FALSE_WITH_IN_OR_NOT_IN_SPACES.search
-           (logical_line))
-    if res:
+    if 'H214' in scan_line(logical_line):
         yield (
             0,
             "H214: Use assertIn/NotIn(A, B) rather than "
@@ -331,9 +508,7 @@ def hacking_assert_equal_in(logical_line):
 
     H215
     """
-    res = (RE_ASSERT_EQUAL_IN_START_WITH_TRUE_OR_FALSE.search(logical_line) or
-           RE_ASSERT_EQUAL_IN_END_WITH_TRUE_OR_FALSE.search(logical_line))
-    if res:
+    if 'H215' in scan_line(logical_line):
         yield (
             0,
             "H215: Use assertIn/NotIn(A, B) rather than "
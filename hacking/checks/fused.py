@@ -0,0 +1,230 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Run all of the hacking logical and physical line checks from two plugins.
+
+flake8 calls every logical and physical line plugin separately, building its
+arguments each time. With ``fused_checks`` set in the hacking configuration,
+the individual line checks are turned off by default and the plugins here run
+them instead: their arguments are gathered once per line, and checks which
+cannot report anything on the line are not called at all.
+"""
+
+import operator
+import threading
+
+from flake8 import style_guide
+
+from hacking import core
+
+
+def _fused_checks_enabled():
+    value = core.get_config().get('fused_checks', default='false')
+    return value.lower() in ('true', 'yes', 'on', '1')
+
+
+def load_checks(kind):
+    """Return the information on the hacking checks of a kind.
+
+    ``kind`` is ``logical_line`` or ``physical_line``. The checks are sorted
+    by code, which is the order flake8 runs them in.
+    """
+    return [info for info in core.get_checks(exclude=[__name__])
+            if info.kind == kind]
+
+
+class FusedChecks:
+    """The checks of one kind, run through the single plugin ``name``."""
+
+    def __init__(self, name, kind, parameters, get_gate):
+        self.name = name
+        self.kind = kind
+        self.enabled = False
+        self.parameters = parameters
+        self.get_gate = get_gate
+        self.checks = []
+        self.off_by_default = {}
+        self.dispatch = ()
+        self.ungated = False
+
+    def load(self):
+        """Load the checks, and whether each of them is off by default."""
+        self.checks = load_checks(self.kind)
+        self.off_by_default = {
+            info.name: info.check.off_by_default for info in self.checks}
+
+    def enable(self):
+        """Run the checks through the plugin rather than on their own.
+
+        flake8 decides which plugins are off by default as it loads them,
+        before calling their add_options() or parse_options(), so this is
+        done when the plugin is loaded. The checks to run are only worked
+        out in parse_options().
+        """
+        self.enabled = True
+        self.load()
+        # flake8 must not run the checks on their own as well
+        for info in self.checks:
+            info.check.off_by_default = True
+
+    def compile(self, enabled_plugins=(), decider=None):
+        """Build the table of the checks to run.
+
+        Checks that are off by default stay off, and checks flake8 runs on
+        its own, ``enabled_plugins``, because they were enabled explicitly
+        with ``enable-extensions`` are left to flake8. With a flake8
+        ``decider``, checks none of whose codes are selected are left out.
+        """
+        dispatch = []
+        for info in self.checks:
+            if (self.off_by_default[info.name] or
+                    info.name in enabled_plugins):
+                continue
+            if decider is not None and not any(
+                    decider.decision_for(code) is style_guide.Decision.Selected
+                    for code in info.codes):
+                continue
+            # The gates are tested by the plugin once for all the checks, so
+            # call the check itself rather than its prefilter
+            body = getattr(info.check, '__wrapped__', info.check)
+            indexes = [self.parameters.index(name) for name in info.inputs]
+            if len(indexes) == 1:
+                index = indexes[0]
+
+                def get_arguments(values, index=index):
+                    return (values[index],)
+            else:
+                get_arguments = operator.itemgetter(*indexes)
+            dispatch.append((self.get_gate(info), body, get_arguments))
+        self.dispatch = tuple(dispatch)
+        self.ungated = any(gate is None for gate, _, _ in dispatch)
+
+    def parse_options(self, options):
+        core.parse_options(options)
+        if not self.enabled:
+            return
+        # flake8 extends the default selection with the names of all of the
+        # plugins it runs, so it would select every H code by the name of
+        # the plugin. Select the names of the checks run through it instead,
+        # as if flake8 ran them on its own.
+        enabled_plugins = frozenset(options.extended_default_select)
+        options.extended_default_select = [
+            name for name in options.extended_default_select
+            if name != self.name] + [
+            info.name for info in self.checks
+            if not self.off_by_default[info.name] and
+            info.name not in enabled_plugins]
+        # The same select and ignore options are applied to the reported
+        # codes later on, per file ignores and noqa comments aside, so
+        # deselected checks need not run at all.
+        self.compile(enabled_plugins, style_guide.DecisionEngine(options))
+
+
+LOGICAL_LINE_CHECKS = FusedChecks(
+    'H', 'logical_line',
+    ['logical_line', 'tokens', 'filename', 'noqa', 'blank_before',
+     'previous_logical', 'indent_level', 'previous_indent_level'],
+    lambda info: info.triggers)
+
+
+@core.flake8ext
+def hacking_logical_line_checks(logical_line, tokens, filename, noqa,
+                                blank_before, previous_logical, indent_level,
+                                previous_indent_level):
+    """Run all of the hacking logical line checks.
+
+    Enabled by ``fused_checks`` in the hacking configuration.
+    """
+    dispatch = LOGICAL_LINE_CHECKS.dispatch
+    if not dispatch:
+        return
+    values = (logical_line, tokens, filename, noqa, blank_before,
+              previous_logical, indent_level, previous_indent_level)
+    found = core.find_triggers(logical_line)
+    for literals, check, get_arguments in dispatch:
+        if literals is not None and literals.isdisjoint(found):
+            continue
+        yield from check(*get_arguments(values)) or ()
+
+
+setattr(hacking_logical_line_checks, 'parse_options',
+        LOGICAL_LINE_CHECKS.parse_options)
+
+
+# What the physical line checks need to report anything:
+#   - 'todo': a to-do note in a comment of the current logical line. H101
+#     looks at all of the tokens of the logical line so far, so this is any
+#     of its physical lines seen so far containing the marker.
+#   - 'docstring': a docstring, which only follows a "def" or "class".
+PHYSICAL_LINE_GATES = {
+    'H101': 'todo',
+    'H401': 'docstring',
+    'H403': 'docstring',
+    'H404': 'docstring',
+    'H405': 'docstring',
+}
+
+PHYSICAL_LINE_CHECKS = FusedChecks(
+    'HP', 'physical_line',
+    ['physical_line', 'previous_logical', 'tokens'],
+    lambda info: PHYSICAL_LINE_GATES.get(info.name))
+# The tokens of the logical line the last physical line belongs to, and
+# whether the to-do marker was found in any of its physical lines, for the
+# file each thread is checking
+_todo_state = threading.local()
+
+
+@core.flake8ext
+def hacking_physical_line_checks(physical_line, previous_logical, tokens):
+    """Run all of the hacking physical line checks.
+
+    Enabled by ``fused_checks`` in the hacking configuration.
+    """
+    dispatch = PHYSICAL_LINE_CHECKS.dispatch
+    if not dispatch:
+        return None
+    # flake8 starts a new list of tokens for each logical line
+    if getattr(_todo_state, 'tokens', None) is not tokens:
+        _todo_state.tokens = tokens
+        _todo_state.found = False
+    if 'TODO' in physical_line:
+        _todo_state.found = True
+    todo = _todo_state.found
+    docstring = previous_logical.startswith(('def ', 'class '))
+    if not (todo or docstring or PHYSICAL_LINE_CHECKS.ungated):
+        return None
+    gates = {'todo': todo, 'docstring': docstring}
+
+    values = (physical_line, previous_logical, tokens)
+    results = []
+    for gate, check, get_arguments in dispatch:
+        if gate is not None and not gates[gate]:
+            continue
+        result = check(*get_arguments(values))
+        if result is None:
+            continue
+        if isinstance(result, tuple) and isinstance(result[0], int):
+            results.append(result)
+        else:
+            results.extend(result)
+    return results or None
+
+
+setattr(hacking_physical_line_checks, 'parse_options',
+        PHYSICAL_LINE_CHECKS.parse_options)
+
+if _fused_checks_enabled():
+    LOGICAL_LINE_CHECKS.enable()
+    PHYSICAL_LINE_CHECKS.enable()
+for plugin, checks in ((hacking_logical_line_checks, LOGICAL_LINE_CHECKS),
+                       (hacking_physical_line_checks, PHYSICAL_LINE_CHECKS)):
+    setattr(plugin, 'off_by_default', not checks.enabled)
@@ -15,11 +15,11 @@ import re
 from hacking import core
 
 RE_RELATIVE_IMPORT = re.compile(r'^from\s*[.]')
-RE_EVENTLET_IMPORT = re.compile(
-    r'^\s*(?:import\s+eventlet(?:\s|$|\.)|from\s+eventlet(?:\s|$|\.))')
 
 
 @core.flake8ext
+@core.triggers('import')
+@core.reports('H301', 'H303', 'H304')
 def hacking_import_rules(logical_line, filename, noqa):
     r"""Check for imports.
 
@@ -53,10 +53,13 @@ def hacking_import_rules(logical_line, filename, noqa):
     if noqa:
         return
 
-    split_line = logical_line.split()
+    parsed = core.parse_import(logical_line)
+    if parsed is None:
+        return
+    split_line = parsed.words
     split_line_len = len(split_line)
-    if (split_line_len > 1 and split_line[0] in ('import', 'from') and
-            not core.is_import_exception(split_line[1])):
+    if (split_line_len > 1 and
+            not core.is_import_exception(split_line[1], filename)):
         pos = logical_line.find(',')
         if pos != -1:
             if split_line[0] == 'from':
@@ -69,7 +72,7 @@ def hacking_import_rules(logical_line, filename, noqa):
         if split_line_len in (2, 4, 6) and split_line[1] != "__future__":
             if 'from' == split_line[0] and split_line_len > 3:
                 mod = '.'.join((split_line[1], split_line[3]))
-                if core.is_import_exception(mod):
+                if core.is_import_exception(mod, filename):
                     return
                 if RE_RELATIVE_IMPORT.search(logical_line):
                     yield logical_line.find('.'), (
@@ -79,6 +82,7 @@ def hacking_import_rules(logical_line, filename, noqa):
 
 
 @core.flake8ext
+@core.triggers('import')
 def hacking_import_alphabetical(logical_line, blank_before, previous_logical,
                                 indent_level, previous_indent_level):
     r"""Check for imports in alphabetical order.
@@ -94,10 +98,12 @@ def hacking_import_alphabetical(logical_line, blank_before, previous_logical,
     # handle import x
     # use .lower since capitalization shouldn't dictate order
     if blank_before < 1 and indent_level == previous_indent_level:
-        split_line = core.import_normalize(logical_line.
-                                           strip()).lower().split()
-        split_previous = core.import_normalize(previous_logical.
-                                               strip()).lower().split()
+        parsed = core.parse_import(logical_line)
+        parsed_previous = core.parse_import(previous_logical)
+        if parsed is None or parsed_previous is None:
+            return
+        split_line = parsed.normalized
+        split_previous = parsed_previous.normalized
         length = [2, 4]
         if (len(split_line) in length and len(split_previous) in length and
                 split_line[0] == "import" and split_previous[0] == "import"):
@@ -108,6 +114,7 @@ def hacking_import_alphabetical(logical_line, blank_before, previous_logical,
 
 @core.flake8ext
 @core.off_by_default
+@core.triggers('eventlet')
 def hacking_no_eventlet(logical_line, noqa):
     r"""Check that eventlet is not imported.
 
@@ -123,6 +130,11 @@ def hacking_no_eventlet(logical_line, noqa):
     if noqa:
         return
 
-    if RE_EVENTLET_IMPORT.match(logical_line):
+    parsed = core.parse_import(logical_line)
+    if parsed is None or len(parsed.words) < 2:
+        return
+
+    module = parsed.words[1]
+    if module == 'eventlet' or module.startswith('eventlet.'):
         yield (0, "H905: eventlet import detected. "
                   "Eventlet is banned, use threading or asyncio instead.")
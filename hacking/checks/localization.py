@@ -10,6 +10,8 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import ast
+import functools
 import re
 import tokenize
 
@@ -26,76 +28,109 @@ FORMAT_RE = re.compile(r"%(?:"
                        r"\w))")        # type
 
 
-class LocalizationError(Exception):
-    pass
+LOCALIZATION_NAMES = frozenset(['_', '_LI', '_LW', '_LE', '_LC'])
+# Found in every line check_i18n() finds a localization call in. flake8 keeps
+# the whitespace between the tokens of a line, so this cannot be one of the
+# literals of core.triggers().
+LOCALIZATION_CALL_RE = re.compile(r"\b_(?:L[IWEC])?\s*\(")
 
+# States of the token scan in check_i18n()
+SCANNING, AFTER_NAME, IN_CALL = range(3)
 
-def check_i18n():
-    """Generator that checks token stream for localization errors.
 
-    Expects tokens to be ``send``ed one by one.
-    Raises LocalizationError if some error is found.
+NOT_JUST_A_STRING = ("H702: Argument to _, _LI, _LW, _LC, or _LE must be "
+                     "just a string")
+# Python 3.12 and later split f-strings into several tokens
+FSTRING_START = getattr(tokenize, 'FSTRING_START', None)
+
+
+@functools.lru_cache(maxsize=1024)
+def decode_string(text):
+    """Return the value of a string literal token without evaluating it.
+
+    Returns None for anything but a plain string, e.g. an f-string or bytes.
     """
-    while True:
-        try:
-            token_type, text, _, _, line = yield
-        except GeneratorExit:
-            return
-
-        if text == "def" and token_type == tokenize.NAME:
-            # explicitly ignore function definitions, as oslo defines these
-            return
-        if (token_type == tokenize.NAME and
-                text in ["_", "_LI", "_LW", "_LE", "_LC"]):
-
-            while True:
-                token_type, text, start, _, _ = yield
-                if token_type != tokenize.NL:
-                    break
-            if token_type != tokenize.OP or text != "(":
-                continue  # not a localization call
+    prefix = text[:len(text) - len(text.lstrip('rRuUbBfF'))].lower()
+    if 'f' in prefix or 'b' in prefix:
+        return None
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+    return value if isinstance(value, str) else None
+
 
+def check_format_string(format_string, token_type, text, start):
+    """Check a localization call once its string arguments were read.
+
+    ``token_type``, ``text`` and ``start`` describe the first token after the
+    strings. Returns an ``(offset, message)`` tuple, or ``None``.
+    """
+    if not format_string:
+        return start, "H701: Empty localization string"
+    if token_type != tokenize.OP:
+        return start, "H701: Invalid localization call"
+    if text != ")":
+        if text == "%":
+            return (start, "H702: Formatting operation should be outside"
+                    " of localization method call")
+        elif text == "+":
+            return start, "H702: Use bare string concatenation instead of +"
+        else:
+            return start, NOT_JUST_A_STRING
+
+    format_specs = FORMAT_RE.findall(format_string)
+    positional_specs = [(key, spec) for key, spec in format_specs
+                        if not key and spec]
+    # not spec means %%, key means %(smth)s
+    if len(positional_specs) > 1:
+        return start, "H703: Multiple positional placeholders"
+    return None
+
+
+def check_i18n(tokens):
+    """Check a token stream for localization errors.
+
+    Returns the first error found as an ``(offset, message)`` tuple, or
+    ``None``. Nothing is built unless a localization call is found.
+    """
+    state = SCANNING
+    format_string = ''
+    for token_type, text, start, _, _ in tokens:
+        if state == SCANNING:
+            if token_type == tokenize.NAME:
+                if text == "def":
+                    # explicitly ignore function definitions, as oslo
+                    # defines these
+                    return None
+                if text in LOCALIZATION_NAMES:
+                    state = AFTER_NAME
+        elif state == AFTER_NAME:
+            if token_type == tokenize.NL:
+                continue
+            if token_type == tokenize.OP and text == "(":
+                state = IN_CALL
+            else:
+                state = SCANNING  # not a localization call
+        elif token_type in (tokenize.STRING, FSTRING_START):
+            value = None
+            if token_type == tokenize.STRING:
+                value = decode_string(text)
+            if value is None:
+                return start, NOT_JUST_A_STRING
+            format_string += value
+        elif token_type != tokenize.NL:
+            error = check_format_string(format_string, token_type, text,
+                                        start)
+            if error is not None:
+                return error
+            state = SCANNING
             format_string = ''
-            while True:
-                token_type, text, start, _, _ = yield
-                if token_type == tokenize.STRING:
-                    format_string += eval(text)
-                elif token_type == tokenize.NL:
-                    pass
-                else:
-                    break
-
-            if not format_string:
-                raise LocalizationError(
-                    start, "H701: Empty localization string")
-            if token_type != tokenize.OP:
-                raise LocalizationError(
-                    start, "H701: Invalid localization call")
-            if text != ")":
-                if text == "%":
-                    raise LocalizationError(
-                        start,
-                        "H702: Formatting operation should be outside"
-                        " of localization method call")
-                elif text == "+":
-                    raise LocalizationError(
-                        start,
-                        "H702: Use bare string concatenation instead of +")
-                else:
-                    raise LocalizationError(
-                        start, "H702: Argument to _, _LI, _LW, _LC, or _LE "
-                        "must be just a string")
-
-            format_specs = FORMAT_RE.findall(format_string)
-            positional_specs = [(key, spec) for key, spec in format_specs
-                                if not key and spec]
-            # not spec means %%, key means %(smth)s
-            if len(positional_specs) > 1:
-                raise LocalizationError(
-                    start, "H703: Multiple positional placeholders")
+    return None
 
 
 @core.flake8ext
+@core.reports('H701', 'H702', 'H703')
 def hacking_localization_strings(logical_line, tokens, noqa):
     r"""Check localization in line.
 
@@ -107,6 +142,7 @@ def hacking_localization_strings(logical_line, tokens, noqa):
     Okay: _("This is also fine %s")
     Okay: _("So is this %s, %(foo)s") % {foo: 'foo'}
     H701: _('')
+    H701: x = _  ("")
     Okay: def _(msg):\n    pass
     Okay: def _LE(msg):\n    pass
     H701: _LI('')
@@ -127,15 +163,14 @@ def hacking_localization_strings(logical_line, tokens, noqa):
     H702: _LC("Bob %s" % foo)
     H702: _("%s %s" % (foo, bar))
     H703: _("%s %s") % (foo, bar)
+    H703: _\t("a %s %s")
+    H702: _(f"foo")
+    H702: _(b"foo")
     """
-    if noqa:
+    if noqa or not LOCALIZATION_CALL_RE.search(logical_line):
         return
-    gen = check_i18n()
-    next(gen)
-    try:
-        list(map(gen.send, tokens))
-        gen.close()
-    except LocalizationError as e:
-        yield e.args
+    error = check_i18n(tokens)
+    if error is not None:
+        yield error
 
 # TODO(jogo) Dict and list objects
@@ -11,7 +11,6 @@
 #  under the License.
 
 import ast
-import re
 
 from hacking import core
 
@@ -19,7 +18,7 @@ from hacking import core
 @core.off_by_default
 @core.flake8ext
 class MockAutospecCheck(object):
-    """Check for 'autospec' in mock.patch/mock.patch.object calls
+    r"""Check for 'autospec' in mock.patch/mock.patch.object calls
 
     Okay: mock.patch('target_module_1', autospec=True)
     Okay: mock.patch('target_module_1', autospec=False)
@@ -50,103 +49,94 @@ class MockAutospecCheck(object):
 
     H210: mock.patch.object('target_module_2', 'attribute', somearg=2)
     H210: mock.patch.object('target_module_2', 'attribute')
+    H210: from unittest.mock import patch\npatch('target_module_1')
+    H210: from unittest import mock as m\nm.patch('target_module_1')
+    H210: from six.moves import mock\nmock.patch('target_module_1')
 
     """
 
     name = "mock_check"
     version = "1.00"
 
-    def __init__(self, tree, filename):
-        self.filename = filename
-        self.tree = tree
-
-    def run(self):
-        mcv = MockCheckVisitor(self.filename)
-        mcv.visit(self.tree)
-        for message in mcv.messages:
-            yield message
-
-
-class MockCheckVisitor(ast.NodeVisitor):
     # Patchers we are looking for and minimum number of 'args' without
     # 'autospec' to not be flagged
     patchers = {'mock.patch': 2, 'mock.patch.object': 3}
     spec_keywords = {"autospec", "new", "new_callable", "spec", "spec_set",
                      "wraps"}
 
-    def __init__(self, filename):
-        super(MockCheckVisitor, self).__init__()
-        self.messages = []
+    def __init__(self, tree, filename):
         self.filename = filename
+        self.tree = tree
 
-    def check_missing_autospec(self, call_node):
-
-        def find_autospec_keyword(keyword_node):
-            for keyword_obj in keyword_node:
-                keyword = keyword_obj.arg
-                # If they have defined autospec or new then it is okay
-                if keyword in self.spec_keywords:
-                    return True
-            return False
-
-        if isinstance(call_node, ast.Call):
-            func_info = FunctionNameFinder(self.filename)
-            func_info.visit(call_node)
-
+    def run(self):
+        index = core.get_import_index(self.tree)
+        names = get_mock_names(index)
+        resolved = {}
+        for node in ast.walk(self.tree):
+            if not isinstance(node, ast.Call):
+                continue
+            name = get_dotted_name(node.func)
+            if name is None:
+                continue
+            head = name.partition('.')[0]
+            if head not in names:
+                continue
+            try:
+                patcher = resolved[name]
+            except KeyError:
+                # see get_mock_names()
+                path = name if head == 'mock' else index.resolve(name)
+                patcher = resolved[name] = canonical_mock_path(path)
             # We are only looking at our patchers
-            if func_info.function_name not in self.patchers:
-                return
-
-            min_args = self.patchers[func_info.function_name]
+            if patcher not in self.patchers:
+                continue
 
-            if not find_autospec_keyword(call_node.keywords):
-                if len(call_node.args) < min_args:
-                    self.messages.append(
-                        (call_node.lineno, call_node.col_offset,
-                         "H210 Missing 'autospec' or 'spec_set' keyword in "
-                         "mock.patch/mock.patch.object", MockCheckVisitor)
-                    )
+            # If they have defined autospec or new then it is okay
+            if any(keyword.arg in self.spec_keywords
+                   for keyword in node.keywords):
+                continue
+            if len(node.args) < self.patchers[patcher]:
+                yield (node.lineno, node.col_offset,
+                       "H210 Missing 'autospec' or 'spec_set' keyword in "
+                       "mock.patch/mock.patch.object", type(self))
 
-    def visit_Call(self, node):
-        self.check_missing_autospec(node)
-        self.generic_visit(node)
-
-
-class FunctionNameFinder(ast.NodeVisitor):
-    """Finds the name of the function"""
-    def __init__(self, filename):
-        super(FunctionNameFinder, self).__init__()
-        self._func_name = []
-        self.filename = filename
 
-    @property
-    def function_name(self):
-        return '.'.join(reversed(self._func_name))
+def canonical_mock_path(path):
+    """Return the path in the mock module, for either of its names."""
+    if path == 'unittest.mock' or path.startswith('unittest.mock.'):
+        return path[len('unittest.'):]
+    return path
 
-    def visit_Name(self, node):
-        self._func_name.append(node.id)
-        self.generic_visit(node)
 
-    def visit_Attribute(self, node):
-        try:
-            self._func_name.append(node.attr)
-            self._func_name.append(node.value.id)
-        except AttributeError:
-            self.generic_visit(node)
+def get_mock_names(index):
+    """Return the names through which a file can reach mock.patch.
 
-    def visit(self, node):
-        # If we get called with an ast.Call node, then work on the 'node.func',
-        # as we want the function name.
-        if isinstance(node, ast.Call):
-            return super(FunctionNameFinder, self).visit(node.func)
-        return super(FunctionNameFinder, self).visit(node)
-
-
-third_party_mock = re.compile('^import.mock')
-from_third_party_mock = re.compile('^from.mock.import')
+    These are the names the imports bind to mock, unittest.mock, unittest
+    or anything in them, and mock itself, which may come from anywhere, e.g.
+    six.moves, a star import or a fixture.
+    """
+    names = {'mock'}
+    for name, path in index.names.items():
+        path = canonical_mock_path(path)
+        if path in ('mock', 'unittest') or path.startswith('mock.'):
+            names.add(name)
+    return names
+
+
+def get_dotted_name(node):
+    """Return the dotted name of a chain of attributes, or None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
 
 
 @core.flake8ext
+@core.triggers('mock')
 def hacking_no_third_party_mock(logical_line, noqa):
     """Check for use of mock instead of unittest.mock.
 
@@ -171,6 +161,11 @@ def hacking_no_third_party_mock(logical_line, noqa):
     if noqa:
         return
 
-    if (re.match(third_party_mock, logical_line) or
-            re.match(from_third_party_mock, logical_line)):
+    parsed = core.parse_import(logical_line)
+    if parsed is None or len(parsed.words) < 2:
+        return
+
+    words = parsed.words
+    if ((words[0] == 'import' and words[1].startswith('mock')) or
+            words[1:3] == ('mock', 'import')):
         yield (0, msg)
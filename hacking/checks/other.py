@@ -10,30 +10,108 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import mmap
+import os
 import re
 
+from hacking.checks import except_checks
 from hacking import core
 
 
-log_string = re.compile(r".*LOG\.(?:error|warn|warning|info"
+log_string = re.compile(r"LOG\.(?:error|warn|warning|info"
                         r"|critical|exception|debug)")
+# A quoted string, as the interpolation check sees them, or a comma
+string_or_comma = re.compile(r"[\"'].+?[\"']|,")
+
+
+# Files at least this large are memory mapped rather than read
+MMAP_THRESHOLD = 1 << 20
+
+
+def find_carriage_returns(data):
+    """Return the numbers of the lines of some bytes with carriage returns.
+
+    Lines are numbered the way Python splits them, so a carriage return on
+    its own ends a line too.
+    """
+    linenos = []
+    lineno = 1
+    start = 0
+    pos = data.find(b'\r')
+    while pos != -1:
+        lineno += data[start:pos].count(b'\n')
+        linenos.append(lineno)
+        if data[pos + 1:pos + 2] != b'\n':
+            lineno += 1
+        start = pos + 1
+        pos = data.find(b'\r', start)
+    return linenos
+
+
+def read_carriage_returns(filename):
+    """Return the numbers of the lines of a file with carriage returns."""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return find_carriage_returns(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return find_carriage_returns(data)
 
 
 @core.flake8ext
-def hacking_no_cr(physical_line):
+class NoCarriageReturnCheck(object):
     r"""Check that we only use newlines not carriage returns.
 
+    The lines flake8 checks have their line endings translated already, so
+    the raw contents of the file are searched instead, once per file.
+
     Okay: import os\nimport sys
-    # pep8 doesn't yet replace \r in strings, will work on an
-    # upstream fix
     H903 import os\r\nimport sys
     """
+
+    # Whether flake8 checks standard input, whose filename is then only the
+    # name given with --stdin-display-name
+    stdin = False
+
+    def __init__(self, tree, filename, lines):
+        self.filename = filename
+        self.lines = lines
+
+    @classmethod
+    def parse_options(cls, options):
+        core.parse_options(options)
+        cls.stdin = '-' in (getattr(options, 'filenames', None) or ())
+
+    def run(self):
+        linenos = None
+        if not self.stdin:
+            try:
+                linenos = read_carriage_returns(self.filename)
+            except OSError:
+                pass
+        if linenos is None:
+            # Standard input, which is only available as lines
+            linenos = find_carriage_returns(''.join(self.lines).encode())
+        for lineno in linenos:
+            yield (lineno, 0,
+                   "H903: Windows style line endings not allowed in code",
+                   type(self))
+
+
+# The physical line check H903 used to be run as. It is no longer registered
+# with flake8, but is kept for the projects importing it.
+
+def hacking_no_cr(physical_line):
+    """Check that we only use newlines not carriage returns.
+
+    Deprecated, NoCarriageReturnCheck runs H903 once per file.
+    """
     if '\r' in physical_line:
         yield (0, "H903: Windows style line endings not allowed in code")
 
 
 @core.flake8ext
 @core.off_by_default
+@core.triggers('LOG.')
 def hacking_delayed_string_interpolation(logical_line, noqa):
     r"""String interpolation should be delayed at logging calls.
 
@@ -48,13 +126,22 @@ def hacking_delayed_string_interpolation(logical_line, noqa):
     if noqa:
         return
 
-    if log_string.match(logical_line):
+    if log_string.search(logical_line):
         # Line is a log statement, strip out strings and see if % is used,
         # just to make sure we don't match on a format specifier in a string.
-        line = re.sub(r"[\"'].+?[\"']", '', logical_line)
         # There are some cases where string formatting of the arguments are
-        # needed, so don't include those when checking.
-        line = re.sub(r",.*", '', line)
+        # needed, so stop at the first comma outside of a string. Both are
+        # done in a single pass over the line.
+        parts = []
+        pos = 0
+        for match in string_or_comma.finditer(logical_line):
+            parts.append(logical_line[pos:match.start()])
+            if match.group() == ',':
+                break
+            pos = match.end()
+        else:
+            parts.append(logical_line[pos:])
+        line = ''.join(parts)
         if '%' in line or '.format(' in line:
             yield 0, msg
 
@@ -67,5 +154,5 @@ def hacking_no_log_warn(logical_line):
     https://docs.python.org/3/library/logging.html#logging.warning
     """
 
-    if "LOG.warn(" in logical_line:
+    if 'H906' in except_checks.scan_line(logical_line):
         yield (0, "H906: LOG.warn is deprecated, please use LOG.warning!")
@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import itertools
 import re
 
 from hacking import core
@@ -18,9 +19,13 @@ from hacking import core
 vim_header_re = re.compile(r"^#\s+vim?:.+")
 
 
-@core.flake8ext
+# vim only looks for modelines in this many lines at each end of a file
+MODELINE_LINES = 5
+
+
 @core.off_by_default
-def no_vim_headers(physical_line, line_number, lines):
+@core.flake8ext
+class NoVimHeadersCheck(object):
     r"""Check for vim editor configuration in source files.
 
     By default vim modelines can only appear in the first or
@@ -34,6 +39,33 @@ def no_vim_headers(physical_line, line_number, lines):
     Okay: # viminal hill is located in Rome
     Okay: # vim, ze nemluvis cesky
     """
-    if ((line_number <= 5 or line_number > len(lines) - 5) and
+
+    name = "vim_check"
+    version = "1.00"
+
+    def __init__(self, tree, lines):
+        self.lines = lines
+
+    def run(self):
+        # only look at the lines vim would, once per file
+        total = len(self.lines)
+        first = range(min(MODELINE_LINES, total))
+        last = range(max(MODELINE_LINES, total - MODELINE_LINES), total)
+        for idx in itertools.chain(first, last):
+            if vim_header_re.match(self.lines[idx]):
+                yield (idx + 1, 0,
+                       "H106: Don't put vim configuration in source files",
+                       type(self))
+
+
+@core.off_by_default
+def no_vim_headers(physical_line, line_number, lines):
+    """Check for vim editor configuration in source files.
+
+    Deprecated, NoVimHeadersCheck runs H106 once per file.
+    """
+    if ((line_number <= MODELINE_LINES or
+            line_number > len(lines) - MODELINE_LINES) and
             vim_header_re.match(physical_line)):
         return 0, "H106: Don't put vim configuration in source files"
+    return None
@@ -12,15 +12,157 @@
 # limitations under the License.
 
 import configparser
-from typing import overload
+import functools
+import os
+import sys
+from typing import Any, overload
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    try:
+        import tomli as tomllib  # type: ignore[import-not-found]
+    except ImportError:
+        tomllib = None
+
+# Files and directories marking the root directory of a project
+PROJECT_ROOT_MARKERS = ('setup.cfg', 'setup.py', 'pyproject.toml', 'tox.ini',
+                        '.git')
+# Files the configuration is read from, in order of preference. The options
+# are read from the [<section>] section of the ini files, and from the
+# [tool.<section>] table of pyproject.toml.
+CONFIG_FILES = ('tox.ini', 'setup.cfg', 'pyproject.toml')
+
+
+def _get_directory(filename: str | None) -> str:
+    if filename and filename not in ('-', 'stdin'):
+        return os.path.dirname(os.path.abspath(filename))
+    return os.getcwd()
+
+
+def find_project_root(filename: str | None) -> str:
+    """Find the root directory of the project a file belongs to.
+
+    This is the nearest directory above the file containing one of
+    PROJECT_ROOT_MARKERS, so each project of a repository holding several
+    gets its own root. Falls back to the current directory if there is no
+    such directory, or no file at all (e.g. when reading from stdin).
+    """
+    root = _find_root_from(_get_directory(filename))
+    if root is not None:
+        return root
+    return os.getcwd()
+
+
+@functools.lru_cache(maxsize=None)
+def _find_root_from(directory: str) -> str | None:
+    # Memoized per directory, and recursive so that every directory walked
+    # through on the way up gets memoized too.
+    for marker in PROJECT_ROOT_MARKERS:
+        if os.path.exists(os.path.join(directory, marker)):
+            return directory
+    parent = os.path.dirname(directory)
+    if parent == directory:
+        return None
+    return _find_root_from(parent)
+
+
+def find_repo_root(filename: str | None) -> str | None:
+    """Find the root directory of the git repository a file belongs to.
+
+    This is the nearest directory above the file containing ``.git``, or
+    None if the file is not in a git repository, e.g. in an sdist.
+    """
+    return _find_from(_get_directory(filename), ('.git',))
+
+
+def find_nearest_directory(
+    filename: str | None, names: tuple[str, ...]
+) -> str | None:
+    """Find the nearest directory above a file containing one of ``names``.
+
+    Only the directories up to the root of the repository of the file are
+    searched, see find_repo_root. Outside of git repositories, they are
+    searched up to the current directory, or up to the root of the
+    filesystem for the files not below it. Returns None if none of them
+    contains any.
+    """
+    return _find_from(_get_directory(filename), names,
+                      find_repo_root(filename) or os.getcwd())
+
+
+@functools.lru_cache(maxsize=None)
+def _find_from(
+    directory: str, names: tuple[str, ...], stop: str | None = None
+) -> str | None:
+    for name in names:
+        if os.path.exists(os.path.join(directory, name)):
+            return directory
+    parent = os.path.dirname(directory)
+    if directory == stop or parent == directory:
+        return None
+    return _find_from(parent, names, stop)
+
+
+def for_file(filename: str | None, section: str = 'hacking') -> 'Config':
+    """Return the configuration applying to a file.
+
+    This is read from the first of CONFIG_FILES with a ``section`` section
+    in the root directory of the project of the file, see find_project_root.
+    The directories above it are not searched, so that an unrelated
+    configuration, e.g. in a home directory or at the top of a repository
+    holding several projects, is not picked up. Configuration files are
+    only looked for and parsed once per project, when first needed.
+    """
+    return _find_config_in(find_project_root(filename), section)
+
+
+@functools.lru_cache(maxsize=None)
+def _find_config_in(directory: str, section: str) -> 'Config':
+    # An empty configuration is returned, and memoized, when there is none,
+    # so that what is cached per configuration is also computed only once.
+    for name in CONFIG_FILES:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            conf = Config(section, tox_file=path)
+            if conf.conf.has_section(section):
+                return conf
+    return Config(section, tox_file=None)
+
+
+def _read_pyproject(
+    conf: configparser.RawConfigParser, pyproject_file: str
+) -> None:
+    if tomllib is None:
+        return
+    try:
+        with open(pyproject_file, 'rb') as f:
+            tool = tomllib.load(f).get('tool', {})
+    except (OSError, tomllib.TOMLDecodeError):
+        return
+
+    def _to_str(value: Any) -> str:
+        if isinstance(value, list):
+            return '\n'.join(str(v) for v in value)
+        return str(value)
+
+    conf.read_dict({
+        section: {option: _to_str(value) for option, value in options.items()}
+        for section, options in tool.items() if isinstance(options, dict)
+    })
 
 
 class Config:
     def __init__(
-        self, default_section: str, tox_file: str = 'tox.ini'
+        self, default_section: str, tox_file: str | None = 'tox.ini'
     ) -> None:
         conf = configparser.RawConfigParser()
-        conf.read(tox_file)
+        if tox_file is None:
+            pass
+        elif os.path.basename(tox_file) == 'pyproject.toml':
+            _read_pyproject(conf, tox_file)
+        else:
+            conf.read(tox_file)
 
         self.conf = conf
         self.default_section = default_section
@@ -74,3 +216,11 @@ class Config:
             result.extend([v.strip() for v in vals.split(',') if v.strip()])
 
         return result
+
+    def items(self, section: str | None = None) -> list[tuple[str, str]]:
+        section = section or self.default_section
+
+        if not self.conf.has_section(section):
+            return []
+
+        return self.conf.items(section)
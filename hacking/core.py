@@ -18,12 +18,20 @@
 Built as a sets of pycodestyle checks using flake8.
 """
 
-from collections.abc import Callable, Generator
+import ast
+from collections.abc import Callable, Iterable
+import functools
 import gettext
-from typing import Any, TypeVar
+import importlib.metadata
+import inspect
+import os
+import re
+import threading
+from typing import Any, NamedTuple, TypeVar
 import warnings
 
 from hacking import config
+from hacking import project
 
 # Import tests need to inject _ properly into the builtins
 gettext.install('hacking')
@@ -32,15 +40,85 @@ gettext.install('hacking')
 F = TypeVar('F', bound=Callable[..., Any])
 
 
+class CheckInfo(NamedTuple):
+    """What is known about a check before running it.
+
+    ``inputs`` are the names of the flake8 parameters the check takes, and
+    ``cost`` a rough class of the work it does on each call: ``'line'`` for
+    string operations on a line, ``'tokens'`` for going through the tokens
+    of a line and ``'tree'`` for going through the syntax tree of a file.
+    """
+
+    name: str
+    check: Callable[..., Any]
+    codes: tuple[str, ...]
+    inputs: tuple[str, ...]
+    triggers: frozenset[str] | None
+    cost: str
+
+    @property
+    def kind(self) -> str:
+        """The kind of plugin flake8 runs the check as."""
+        for kind in ('tree', 'logical_line'):
+            if kind in self.inputs:
+                return kind
+        return 'physical_line'
+
+
+# The checks decorated with flake8ext, by "module:name" as in entry points
+REGISTRY: dict[str, CheckInfo] = {}
+
+
+def _describe(f: Callable[..., Any], name: str = '') -> CheckInfo:
+    inputs = tuple(
+        parameter.name
+        for parameter in inspect.signature(f).parameters.values()
+        if parameter.kind not in (parameter.VAR_POSITIONAL,
+                                  parameter.VAR_KEYWORD))
+    if 'tree' in inputs:
+        cost = 'tree'
+    elif 'tokens' in inputs:
+        cost = 'tokens'
+    else:
+        cost = 'line'
+    return CheckInfo(name, f, getattr(f, 'codes', ()), inputs,
+                     getattr(f, 'triggers', None), cost)
+
+
 def flake8ext(f: F) -> F:
+    if inspect.isfunction(f) and getattr(f, 'triggers', None):
+        f = _prefilter(f)
     setattr(f, 'name', __name__)
     setattr(f, 'version', '0.0.1')
     setattr(f, 'skip_on_py3', False)
     if not hasattr(f, 'off_by_default'):
         setattr(f, 'off_by_default', False)
+    if not hasattr(f, 'parse_options'):
+        setattr(f, 'parse_options', parse_options)
+    REGISTRY['%s:%s' % (f.__module__, f.__qualname__)] = _describe(f)
     return f
 
 
+def get_checks(exclude: Iterable[str] = ()) -> list[CheckInfo]:
+    """Return the hacking checks registered as flake8 plugins.
+
+    The checks are sorted by the name of their entry point, which is also
+    their code when they do not declare their codes with reports(). The
+    modules in ``exclude`` are not loaded.
+    """
+    exclude = frozenset(exclude)
+    checks = []
+    for entry in importlib.metadata.entry_points(group='flake8.extension'):
+        if (not entry.module.startswith('hacking.') or
+                entry.module in exclude):
+            continue
+        check = entry.load()
+        info = REGISTRY.get(entry.value) or _describe(check)
+        checks.append(info._replace(name=entry.name,
+                                    codes=info.codes or (entry.name,)))
+    return sorted(checks, key=lambda info: info.name)
+
+
 def off_by_default(f: F) -> F:
     """Decorator to turn check off by default.
 
@@ -54,6 +132,46 @@ def off_by_default(f: F) -> F:
     return f
 
 
+def triggers(*literals: str) -> Callable[[F], F]:
+    """Decorator declaring the literals a logical line check looks for.
+
+    The check is only run on logical lines containing at least one of the
+    literals, so they must be a necessary condition for the check to report
+    anything. Keep in mind that flake8 replaces the contents of strings in
+    logical lines with 'x' characters.
+
+    Example::
+
+        @core.flake8ext
+        @core.triggers('LOG.')
+        def hacking_no_log_foo(logical_line):
+            ...
+    """
+    def decorator(f: F) -> F:
+        setattr(f, 'triggers', frozenset(literals))
+        return f
+    return decorator
+
+
+def reports(*codes: str) -> Callable[[F], F]:
+    """Decorator declaring the codes a check reports.
+
+    Only needed when they are not just the code the check is registered
+    under, so that the check can be left out when none of them are selected.
+
+    Example::
+
+        @core.flake8ext
+        @core.reports('H701', 'H702')
+        def hacking_localization_foo(logical_line):
+            ...
+    """
+    def decorator(f: F) -> F:
+        setattr(f, 'codes', tuple(codes))
+        return f
+    return decorator
+
+
 def skip_on_py3(f: F) -> F:
     warnings.warn(
         "The skip_on_py3 decorator is deprecated for removal: any check that "
@@ -63,6 +181,96 @@ def skip_on_py3(f: F) -> F:
     setattr(f, 'skip_on_py3', True)
     return f
 
+
+_TRIGGERS: set[str] = set()
+# Compiled scanner for _TRIGGERS and, for each literal it can report, the
+# literals found along with it (any trigger which is a prefix of another)
+_trigger_scanner: tuple[re.Pattern[str], dict[str, frozenset[str]]] | None
+_trigger_scanner = None
+
+
+def _register_triggers(literals: Iterable[str]) -> None:
+    global _trigger_scanner
+    if not _TRIGGERS.issuperset(literals):
+        _TRIGGERS.update(literals)
+        _trigger_scanner = None
+        find_triggers.cache_clear()
+
+
+def _compile_trigger_scanner() -> tuple[
+    re.Pattern[str], dict[str, frozenset[str]]
+]:
+    # Longer literals first, so that of the literals starting at a given
+    # position the longest is the one matched; the shorter ones are then
+    # implied by it.
+    literals = sorted(_TRIGGERS, key=len, reverse=True)
+    pattern = re.compile(
+        '(?=(%s))' % '|'.join(re.escape(literal) for literal in literals))
+    implied = {
+        literal: frozenset(t for t in literals if literal.startswith(t))
+        for literal in literals
+    }
+    return pattern, implied
+
+
+@functools.lru_cache(maxsize=1)
+def find_triggers(logical_line: str) -> frozenset[str]:
+    """Return the trigger literals found in a logical line.
+
+    This is a single scan of the line for the literals declared by all the
+    checks, shared by every check run against that line.
+    """
+    global _trigger_scanner
+    scanner = _trigger_scanner
+    if scanner is None:
+        scanner = _trigger_scanner = _compile_trigger_scanner()
+    pattern, implied = scanner
+    found: frozenset[str] = frozenset()
+    for literal in pattern.findall(logical_line):
+        found |= implied[literal]
+    return found
+
+
+def _prefilter(f: F) -> F:
+    """Wrap a check so it is skipped on lines without its triggers."""
+    literals = getattr(f, 'triggers')
+    _register_triggers(literals)
+    index = list(inspect.signature(f).parameters).index('logical_line')
+
+    @functools.wraps(f)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if index < len(args):
+            logical_line = args[index]
+        else:
+            logical_line = kwargs['logical_line']
+        if literals.isdisjoint(find_triggers(logical_line)):
+            return ()
+        return f(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def memoize_last(f: F) -> F:
+    """Cache the result of a function for the last first argument it got.
+
+    flake8 passes the same ``tree`` and ``lines`` objects to every plugin run
+    against a file, so checks that share an analysis of the file can key it
+    on the identity of one of those objects and compute it only once per
+    file. Any other arguments must be the same for the same file. Each thread
+    has its own cache, as each file is checked by a single thread.
+    """
+    cache = threading.local()
+
+    @functools.wraps(f)
+    def wrapper(arg: Any, *args: Any) -> Any:
+        last = getattr(cache, 'last', None)
+        if last is None or last[0] is not arg:
+            last = cache.last = (arg, f(arg, *args))
+        return last[1]
+
+    return wrapper  # type: ignore[return-value]
+
+
 # Error code block layout
 
 # H1xx comments
@@ -76,9 +284,6 @@ def skip_on_py3(f: F) -> F:
 # H9xx other
 
 
-CONF = config.Config('hacking')
-
-
 DEFAULT_IMPORT_EXCEPTIONS = [
     'collections.abc',
     'sqlalchemy',
@@ -86,17 +291,73 @@ DEFAULT_IMPORT_EXCEPTIONS = [
     'typing'
 ]
 
-IMPORT_EXCEPTIONS = CONF.get_multiple('import_exceptions', default=[])
-IMPORT_EXCEPTIONS += DEFAULT_IMPORT_EXCEPTIONS
+
+def get_config(filename: str | None = None) -> config.Config:
+    """Return the hacking configuration applying to a file.
+
+    See hacking.config.for_file.
+    """
+    return config.for_file(filename, 'hacking')
+
+
+def get_import_exceptions(filename: str | None = None) -> list[str]:
+    """Return the import exceptions applying to a file."""
+    return list(_get_import_exceptions(get_config(filename)))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_import_exceptions(conf: config.Config) -> tuple[str, ...]:
+    # A tuple, as the result is shared by all the files using conf
+    import_exceptions = conf.get_multiple('import_exceptions', default=[])
+    return tuple(import_exceptions + DEFAULT_IMPORT_EXCEPTIONS)
+
+
+def __getattr__(name: str) -> Any:
+    # CONF and IMPORT_EXCEPTIONS used to be read from the tox.ini file of the
+    # current directory on import, they are now only read if used.
+    if name == 'CONF':
+        return get_config()
+    if name == 'IMPORT_EXCEPTIONS':
+        return get_import_exceptions()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+class ImportExceptions:
+    """The modules import rules do not apply to, and their submodules.
+
+    Looking up a module costs one set lookup per level of its dotted path,
+    however many modules there are, and the result is memoized per module.
+    """
+
+    def __init__(self, modules: Iterable[str]) -> None:
+        self.modules = frozenset(modules)
+        self._cache: dict[str, bool] = {}
+
+    def __contains__(self, mod: str) -> bool:
+        try:
+            return self._cache[mod]
+        except KeyError:
+            pass
+        found = mod in self.modules
+        idx = mod.find('.')
+        while not found and idx != -1:
+            found = mod[:idx] in self.modules
+            idx = mod.find('.', idx + 1)
+        self._cache[mod] = found
+        return found
 
 
-def is_import_exception(mod: str) -> bool:
+@functools.lru_cache(maxsize=None)
+def _get_import_exception_set(conf: config.Config) -> ImportExceptions:
+    return ImportExceptions(_get_import_exceptions(conf))
+
+
+def is_import_exception(mod: str, filename: str | None = None) -> bool:
     """Check module name to see if import has been whitelisted.
 
        Import based rules should not run on any whitelisted module
        """
-    return (mod in IMPORT_EXCEPTIONS or
-            any(mod.startswith(m + '.') for m in IMPORT_EXCEPTIONS))
+    return mod in _get_import_exception_set(get_config(filename))
 
 
 def import_normalize(line: str) -> str:
@@ -113,35 +374,138 @@ def import_normalize(line: str) -> str:
         return line
 
 
-# TODO(stephenfin): Remove this class. No one is using it.
-class GlobalCheck:
-    """Base class for checks that should be run only once."""
+class ImportLine(NamedTuple):
+    """A logical line that starts with ``import`` or ``from``."""
+
+    #: The whitespace separated words of the line.
+    words: tuple[str, ...]
+    #: The lowercased words of the line after :func:`import_normalize`.
+    normalized: tuple[str, ...]
 
-    name = None
-    version = '0.0.1'
-    skip_on_py3 = False
-    _has_run: set[str] = set()
 
-    def __init__(self, tree, *args):
-        warnings.warn(
-            'The {self.__class__.__name__} class is deprecated for removal',
-            DeprecationWarning,
-        )
-        pass
+@functools.lru_cache(maxsize=256)
+def parse_import(logical_line: str) -> ImportLine | None:
+    """Split an import line once for all of the import checks.
+
+    Returns ``None`` if the line is not an import. The result is cached, so
+    the checks that look at the same line, and H306 looking at the previous
+    line again, do not split and normalize it over and over.
+    """
+    line = logical_line.strip()
+    words = tuple(line.split())
+    if not words or words[0] not in ('import', 'from'):
+        return None
+    return ImportLine(words, tuple(import_normalize(line).lower().split()))
 
-    def run(self) -> Generator[Any]:
-        """Make run a no-op if run() has been called before.
 
-        Store in a global registry the list of checks we've run. If we have
-        run that one before, just skip doing anything the subsequent times.
-        This way, since pycodestyle is file/line based, we don't wind
-        up re-running a check on a git commit message over and over again.
+class ImportIndex:
+    """The imports of a file, collected from its tree.
+
+    ``modules`` holds every imported module, including ``module.name`` for
+    ``from module import name``, and ``names`` maps the names the imports
+    bind to the dotted path they refer to.
+    """
+
+    #: The fields of statements that hold nested statements.
+    BODY_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+    def __init__(self, tree: ast.AST) -> None:
+        self.modules: set[str] = set()
+        self.names: dict[str, str] = {}
+        self.star_import = False
+        # Imports are statements, so only walk the statements and leave out
+        # the expressions, which make up most of the tree. Statements are
+        # visited in source order, so later imports of a name win.
+        nodes: list[ast.AST] = [tree]
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Import):
+                self._add_import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self._add_import_from(node)
+            else:
+                for field in reversed(self.BODY_FIELDS):
+                    body = getattr(node, field, None)
+                    if isinstance(body, list):
+                        nodes.extend(reversed(body))
+
+    def _add_import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.modules.add(alias.name)
+            if alias.asname:
+                self.names[alias.asname] = alias.name
+            else:
+                name = alias.name.partition('.')[0]
+                self.names[name] = name
+
+    def _add_import_from(self, node: ast.ImportFrom) -> None:
+        module = '.' * node.level + (node.module or '')
+        self.modules.add(module)
+        for alias in node.names:
+            if alias.name == '*':
+                self.star_import = True
+                continue
+            if module.endswith('.'):
+                path = module + alias.name
+            else:
+                path = '%s.%s' % (module, alias.name)
+            self.modules.add(path)
+            self.names[alias.asname or alias.name] = path
+
+    def resolve(self, dotted_name: str) -> str:
+        """Return the path a dotted name refers to through the imports.
+
+        Names not bound by an import are returned unchanged.
         """
-        if self.name and self.name not in self.__class__._has_run:
-            self.__class__._has_run.add(self.name)
-            ret = self.run_once()
-            if ret is not None:
-                yield ret
-
-    def run_once(self) -> Any:
-        pass
+        head, dot, rest = dotted_name.partition('.')
+        path = self.names.get(head)
+        if path is None:
+            return dotted_name
+        return path + dot + rest
+
+
+@memoize_last
+def get_import_index(tree: ast.AST) -> ImportIndex:
+    """Return the :class:`ImportIndex` of a file, built once per tree."""
+    return ImportIndex(tree)
+
+
+# The paths warm_up() was called for
+_warmed_up: set[tuple[str, ...]] = set()
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(paths: Iterable[str]) -> None:
+    """Compute the state the checks share between files, for some paths.
+
+    This is the facts about the projects of the paths, their configuration
+    and import exceptions, and the trigger scanner. The regular expressions
+    of the checks are compiled when their modules are imported, as flake8
+    loads the plugins.
+    """
+    global _trigger_scanner
+    paths = tuple(paths)
+    with _warm_up_lock:
+        if paths in _warmed_up:
+            return
+        _warmed_up.add(paths)
+
+        if _trigger_scanner is None and _TRIGGERS:
+            _trigger_scanner = _compile_trigger_scanner()
+        project.prepare(paths)
+        directories = {path for path in paths if os.path.isdir(path)}
+        directories.update(project.get_roots(paths))
+        for directory in directories:
+            # The configuration is looked for from the directory of a file
+            conf = get_config(os.path.join(directory, '__init__.py'))
+            _get_import_exception_set(conf)
+
+
+def parse_options(options: Any) -> None:
+    """Warm up the state of the checks for the paths flake8 checks.
+
+    flake8 calls this for every plugin when it parses its options, in its
+    main process before it starts any worker process, so the workers inherit
+    that state instead of each computing it again.
+    """
+    warm_up(getattr(options, 'filenames', None) or ['.'])
@@ -0,0 +1,109 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""The files and lines changed since a git revision.
+
+Used by hacking.runner to only check the files changed since a revision, and
+only report the problems on the lines changed in them.
+"""
+
+from collections.abc import Iterable
+import os
+import re
+import subprocess
+
+# Codes of problems with a whole file rather than with some lines of it,
+# which are reported whichever lines of the file changed
+FILE_CODES = frozenset(['H102', 'H103', 'H104'])
+
+HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', re.MULTILINE)
+
+
+class GitError(Exception):
+    """Running git failed."""
+
+
+def _git(args: list[str], cwd: str | None) -> str:
+    try:
+        process = subprocess.run(
+            ['git'] + args, cwd=cwd, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, universal_newlines=True)
+    except OSError as exc:
+        raise GitError('Could not run git: %s' % exc)
+    if process.returncode:
+        raise GitError(process.stderr.strip())
+    return process.stdout
+
+
+def parse_diff(diff: str) -> dict[str, list[range]]:
+    """Return the line ranges added or changed by the files of a diff.
+
+    ``diff`` is the output of ``git diff --unified=0``. The files are the
+    paths in the new version of the diff, and files only removed by it are
+    left out.
+    """
+    changes: dict[str, list[range]] = {}
+    for section in re.split(r'^diff --git ', diff, flags=re.MULTILINE)[1:]:
+        match = re.search(r'^\+\+\+ b/(.*)$', section, re.MULTILINE)
+        if match is None:
+            continue
+        lines = changes.setdefault(match.group(1), [])
+        for hunk in HUNK_RE.finditer(section):
+            start = int(hunk.group(1))
+            count = 1 if hunk.group(2) is None else int(hunk.group(2))
+            if count:
+                lines.append(range(start, start + count))
+    return changes
+
+
+def get_changes(base: str, cwd: str | None = None) -> 'Changes':
+    """Return the changes of the working tree since a git revision.
+
+    Files git does not track yet, unless ignored, are changed entirely.
+    """
+    diff = _git(['diff', '--unified=0', '--no-color', '--no-ext-diff',
+                 '--src-prefix=a/', '--dst-prefix=b/', '--relative', base,
+                 '--'], cwd)
+    changes = parse_diff(diff)
+    untracked = _git(['ls-files', '--others', '--exclude-standard'], cwd)
+    for path in untracked.splitlines():
+        changes[path] = [range(1, 2 ** 31)]
+    return Changes(cwd or os.getcwd(), changes)
+
+
+class Changes:
+    """The lines changed in files, by absolute path."""
+
+    def __init__(self, directory: str,
+                 changes: dict[str, list[range]]) -> None:
+        self.files = {
+            os.path.normpath(os.path.join(directory, path)): lines
+            for path, lines in changes.items()
+        }
+
+    def _get_lines(self, filename: str) -> list[range] | None:
+        return self.files.get(os.path.abspath(filename))
+
+    def is_changed(self, filename: str) -> bool:
+        """Return whether a file changed."""
+        return self._get_lines(filename) is not None
+
+    def filter_results(self, filename: str,
+                       results: Iterable[tuple]) -> list[tuple]:
+        """Return the flake8 results of a file on its changed lines.
+
+        The results are ``(code, line_number, ...)`` tuples.
+        """
+        lines = self._get_lines(filename) or []
+        return [result for result in results
+                if result[0] in FILE_CODES or
+                any(result[1] in changed for changed in lines)]
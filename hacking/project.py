@@ -0,0 +1,173 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Facts about and checks of whole projects, computed once per run.
+
+flake8 runs the plugins on each file separately, possibly in several worker
+processes, so anything about the project a file belongs to would otherwise be
+worked out again by every worker. The facts and project checks registered
+here are computed for the projects of the paths flake8 was given when it
+parses its options, in the main process before it starts any worker, and the
+workers inherit them. Everything is memoized per project root as well, for
+files outside of those projects and for workers which are not forked, and
+computed under a lock so that threads checking files of the same project
+wait for each other rather than compute it again.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+import functools
+import os
+import threading
+from typing import Any, TypeVar
+
+from hacking import config
+
+
+F = TypeVar('F', bound=Callable[[str], Any])
+G = TypeVar('G', bound=Callable[[str | None], Any])
+
+# The registered facts and project checks
+FACTS: list[Callable[[str], Any]] = []
+FILE_FACTS: list[Callable[[str | None], Any]] = []
+CHECKS: list[type['ProjectCheck']] = []
+# Held while computing facts and project checks, which may use facts
+_lock = threading.RLock()
+
+
+def fact(f: F) -> F:
+    """Decorator registering a fact about a project.
+
+    The function is called with the root directory of a project, see
+    hacking.config.find_project_root, and only once per project.
+
+    Example::
+
+        @project.fact
+        def has_readme(root):
+            return os.path.exists(os.path.join(root, 'README.rst'))
+    """
+    cached = functools.lru_cache(maxsize=None)(f)
+
+    @functools.wraps(f)
+    def wrapper(root: str) -> Any:
+        with _lock:
+            return cached(root)
+
+    FACTS.append(wrapper)
+    return wrapper  # type: ignore[return-value]
+
+
+def file_fact(f: G) -> G:
+    """Decorator registering a fact about the project of a file.
+
+    For the facts which depend on where the file is in its project rather
+    than only on the project. The function is called with the name of a
+    file, or None for stdin, and memoizes whatever it can itself.
+    """
+    FILE_FACTS.append(f)
+    return f
+
+
+def get_root(filename: str | None) -> str:
+    """Return the root directory of the project a file belongs to."""
+    return config.find_project_root(filename)
+
+
+def _get_filename(path: str) -> str | None:
+    if path in ('-', 'stdin'):
+        return None
+    if os.path.isdir(path):
+        # Roots are looked for from the directory of a file
+        return os.path.join(path, '__init__.py')
+    return path
+
+
+def get_roots(paths: Iterable[str]) -> set[str]:
+    """Return the root directories of the projects of files or directories."""
+    return {get_root(_get_filename(path)) for path in paths}
+
+
+def prepare(paths: Iterable[str]) -> None:
+    """Compute all of the facts and project checks for some paths."""
+    paths = list(paths)
+    for root in get_roots(paths):
+        for project_fact in FACTS:
+            project_fact(root)
+        for check in CHECKS:
+            check.get_problems(root)
+    for path in paths:
+        for project_file_fact in FILE_FACTS:
+            project_file_fact(_get_filename(path))
+
+
+class ProjectCheck:
+    """Base class for checks of a whole project rather than of a file.
+
+    Subclasses implement check_project(), which is run once per project. The
+    problems it finds are reported when flake8 checks the files they are in,
+    so they are reported once, whichever worker checks the file. Problems in
+    files flake8 does not check are not reported.
+    """
+
+    name = 'project_check'
+    version = '1.00'
+    # The problems found in each project, by path relative to its root
+    _problems: dict[tuple[type['ProjectCheck'], str],
+                    dict[str, list[tuple[int, int, str]]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        CHECKS.append(cls)
+
+    def __init__(self, tree: Any, filename: str) -> None:
+        self.filename = filename
+
+    @classmethod
+    def parse_options(cls, options: Any) -> None:
+        prepare(getattr(options, 'filenames', None) or ['.'])
+
+    @classmethod
+    def check_project(
+        cls, root: str
+    ) -> Iterable[tuple[str, int, int, str]]:
+        """Yield the problems of a project.
+
+        Each problem is a ``(path, lineno, col_offset, message)`` tuple, the
+        path being relative to the root directory of the project.
+        """
+        return ()
+
+    @classmethod
+    def get_problems(
+        cls, root: str
+    ) -> dict[str, list[tuple[int, int, str]]]:
+        """Return the problems of a project, by path, checking it once."""
+        key = (cls, root)
+        with _lock:
+            problems = cls._problems.get(key)
+            if problems is None:
+                problems = {}
+                for path, lineno, col_offset, message in cls.check_project(
+                        root):
+                    problems.setdefault(os.path.normpath(path), []).append(
+                        (lineno, col_offset, message))
+                cls._problems[key] = problems
+        return problems
+
+    def run(self) -> Iterator[tuple[int, int, str, type]]:
+        if self.filename in ('-', 'stdin'):
+            return
+        root = get_root(self.filename)
+        path = os.path.relpath(os.path.abspath(self.filename), root)
+        for lineno, col_offset, message in self.get_problems(root).get(
+                path, ()):
+            yield lineno, col_offset, message, type(self)
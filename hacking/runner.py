@@ -0,0 +1,189 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Run flake8 with the files checked by threads rather than processes.
+
+flake8 checks files in a pool of worker processes, each with its own copy of
+the configuration and caches of the checks, and pickles the results back.
+This runs the same checks in a pool of threads of a single process instead,
+sharing all of that. On free-threaded builds of CPython the threads run in
+parallel; elsewhere they are limited by the GIL.
+
+It takes the same arguments as flake8::
+
+    python -m hacking.runner --jobs 8 nova
+
+With ``cache_dir`` set in the hacking configuration, the results of checking
+each file are also kept in a hacking.cache.ResultCache there, and files which
+did not change are not checked again.
+
+With ``--diff-base REF``, only the files changed since the git revision REF
+are checked, and only the problems on the lines changed are reported, see
+hacking.diff.
+"""
+
+import argparse
+from collections.abc import Sequence
+import concurrent.futures
+import itertools
+import sys
+from typing import Any
+
+from flake8 import checker
+from flake8.main import application
+
+from hacking import cache
+from hacking import core
+from hacking import diff
+from hacking import project
+
+# flake8 options which only change how the results are output
+OUTPUT_OPTIONS = frozenset([
+    'benchmark', 'bug_report', 'color', 'count', 'exit_zero', 'filenames',
+    'format', 'jobs', 'output_file', 'quiet', 'show_source', 'statistics',
+    'tee', 'verbose',
+])
+
+
+def get_cache():
+    """Return the result cache set up in the hacking configuration."""
+    conf = core.get_config()
+    directory = conf.get('cache_dir')
+    if not directory:
+        return None
+    size = conf.get('cache_size')
+    return cache.ResultCache(
+        directory, int(size) if size else cache.DEFAULT_MAX_ENTRIES)
+
+
+class ThreadedManager(checker.Manager):
+    """A flake8 file checker manager running the checks in threads."""
+
+    filenames: tuple[str, ...]
+    jobs: int
+
+    def __init__(self, *args: Any, changes: diff.Changes | None = None,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.changes = changes
+        self.cache = get_cache()
+        plugins = sorted(
+            '%s=%s %s' % (plugin.entry_name, plugin.plugin.package,
+                          plugin.plugin.version)
+            for plugin in itertools.chain(self.plugins.tree,
+                                          self.plugins.logical_line,
+                                          self.plugins.physical_line))
+        options = sorted(
+            '%s=%r' % item for item in vars(self.options).items()
+            if item[0] not in OUTPUT_OPTIONS)
+        self.settings = '\n'.join(plugins + options)
+
+    def _get_cache_key(self, filename):
+        """Return the key of the results of a file in the cache."""
+        try:
+            with open(filename, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        root = project.get_root(filename)
+        return cache.make_key(content, [
+            filename,
+            self.settings,
+            repr(core.get_config(filename).items()),
+            repr([fact(root) for fact in project.FACTS]),
+            repr([fact(filename) for fact in project.FILE_FACTS]),
+        ])
+
+    def start(self) -> None:
+        super().start()
+        if self.changes is not None:
+            self.filenames = tuple(filename for filename in self.filenames
+                                   if self.changes.is_changed(filename))
+            self.jobs = min(len(self.filenames), self.jobs)
+
+    def _run_checks(self, filename):
+        filename, results, statistics = self._get_results(filename)
+        if self.changes is not None:
+            results = self.changes.filter_results(filename, results)
+        return filename, results, statistics
+
+    def _get_results(self, filename):
+        key = None
+        if self.cache is not None:
+            key = self._get_cache_key(filename)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                results, statistics = entry
+                return filename, [tuple(r) for r in results], statistics
+        filename, results, statistics = checker.FileChecker(
+            filename=filename, plugins=self.plugins, options=self.options,
+        ).run_checks()
+        if key is not None:
+            self.cache.put(key, [results, statistics])
+        return filename, results, statistics
+
+    def run_parallel(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(self.jobs) as executor:
+            self.results = list(executor.map(self._run_checks,
+                                             self.filenames))
+
+    def run_serial(self) -> None:
+        self.results = [self._run_checks(filename)
+                        for filename in self.filenames]
+
+    def stop(self) -> None:
+        super().stop()
+        if self.cache is not None:
+            self.cache.prune()
+            self.cache.close()
+
+
+class Application(application.Application):
+    """The flake8 application, with the files checked by threads."""
+
+    def __init__(self, changes: diff.Changes | None = None) -> None:
+        super().__init__()
+        self.changes = changes
+
+    def make_file_checker_manager(self, argv: Sequence[str]) -> None:
+        assert self.guide is not None
+        assert self.plugins is not None
+        self.file_checker_manager = ThreadedManager(
+            style_guide=self.guide,
+            plugins=self.plugins.checkers,
+            argv=argv,
+            changes=self.changes,
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--diff-base')
+    args, argv = parser.parse_known_args(argv)
+    changes = None
+    if args.diff_base:
+        try:
+            changes = diff.get_changes(args.diff_base)
+        except diff.GitError as exc:
+            print('Could not find the changes since %s: %s'
+                  % (args.diff_base, exc), file=sys.stderr)
+            return 1
+    app = Application(changes)
+    app.run(argv)
+    return app.exit_code()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Run the hacking checks without the rest of flake8.
+
+The ``hacking`` command runs the checks hacking registers as flake8 plugins
+and nothing else. It does not load the other flake8 plugins, such as
+pycodestyle and pyflakes, nor go through the flake8 option and configuration
+handling. The files are split into logical and physical lines by the same
+flake8 file processor, so the results are the ones flake8 reports for the H
+codes, and are printed as soon as the files before them are checked.
+
+Only the options of flake8 which matter to the hacking checks are supported::
+
+    hacking --jobs 8 --enable-extensions H904 nova
+"""
+
+import argparse
+from collections.abc import Iterable, Sequence
+import multiprocessing
+import operator
+import sys
+import tokenize
+from typing import Any
+
+from flake8 import checker
+from flake8 import defaults
+from flake8 import discover_files
+from flake8 import processor
+from flake8 import style_guide
+from flake8 import violation
+
+from hacking import core
+
+DEFAULT_FORMAT = '%(path)s:%(row)d:%(col)d: %(code)s %(text)s'
+# The options of the flake8 file processor, which only the pycodestyle
+# checks use
+PROCESSOR_OPTIONS = argparse.Namespace(
+    hang_closing=False, indent_size=defaults.INDENT_SIZE,
+    max_line_length=defaults.MAX_LINE_LENGTH, max_doc_length=None,
+    verbose=0, stdin_display_name='stdin', disable_noqa=False)
+# The plugins running the other checks, see hacking.checks.fused
+EXCLUDED_MODULES = ['hacking.checks.fused']
+
+
+def _comma_separated(value: str) -> list[str]:
+    return [code.strip() for code in value.split(',') if code.strip()]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='hacking', description='Run the hacking checks on some files.')
+    parser.add_argument('paths', nargs='*', default=['.'],
+                        help='files and directories to check, or - for '
+                             'standard input')
+    parser.add_argument('--select', type=_comma_separated,
+                        help='codes to report, instead of all of the codes '
+                             'of the checks enabled')
+    parser.add_argument('--ignore', type=_comma_separated,
+                        help='codes not to report')
+    parser.add_argument('--enable-extensions', type=_comma_separated,
+                        default=[],
+                        help='checks off by default to enable')
+    parser.add_argument('--exclude', type=_comma_separated,
+                        default=list(defaults.EXCLUDE),
+                        help='files and directories not to check')
+    parser.add_argument('--filename', type=_comma_separated,
+                        default=['*.py'],
+                        help='patterns of the files to check in directories')
+    parser.add_argument('--format', default=DEFAULT_FORMAT,
+                        help='format of the problems reported, default %s'
+                             % DEFAULT_FORMAT.replace('%', '%%'))
+    parser.add_argument('-j', '--jobs', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='number of processes checking files')
+    return parser
+
+
+class Checker:
+    """The hacking checks selected, to run on files."""
+
+    def __init__(self, select: Sequence[str] | None = None,
+                 ignore: Sequence[str] | None = None,
+                 enable_extensions: Iterable[str] = ()) -> None:
+        enable_extensions = frozenset(enable_extensions)
+        checks = [info for info in core.get_checks(exclude=EXCLUDED_MODULES)
+                  if not getattr(info.check, 'off_by_default', False) or
+                  info.name in enable_extensions]
+        self.decider = style_guide.DecisionEngine(argparse.Namespace(
+            select=select, extend_select=None, ignore=ignore,
+            extend_ignore=None,
+            extended_default_select=[code for info in checks
+                                     for code in info.codes],
+            extended_default_ignore=[]))
+        selected = [info for info in checks if any(
+            self.decider.decision_for(code) is style_guide.Decision.Selected
+            for code in info.codes)]
+
+        def get_checks(kind: str) -> list[tuple[Any, tuple[str, ...]]]:
+            # The check, and the names of its arguments taken from the
+            # file processor
+            return [(info.check, tuple(name for name in info.inputs
+                                       if name not in ('tree', kind)))
+                    for info in selected if info.kind == kind]
+
+        self.tree = get_checks('tree')
+        self.logical_line = get_checks('logical_line')
+        self.physical_line = get_checks('physical_line')
+
+    def is_selected(self, code: str) -> bool:
+        return (self.decider.decision_for(code) is
+                style_guide.Decision.Selected)
+
+    def check_file(self, filename: str) -> tuple[str, list[tuple]]:
+        """Check a file.
+
+        Returns the name the file is displayed as, and the problems found in
+        it as ``(code, row, col, text, physical_line)`` tuples sorted by
+        position. Columns start from 0.
+        """
+        try:
+            file_processor = processor.FileProcessor(filename,
+                                                     PROCESSOR_OPTIONS)
+        except OSError as exc:
+            return filename, [('E902', 0, 0, '%s: %s' % (type(exc).__name__,
+                                                         exc), None)]
+        if file_processor.should_ignore_file():
+            return file_processor.filename, []
+        run = FileRun(self, file_processor)
+        try:
+            run.run_tree_checks()
+            run.process_tokens()
+        except (SyntaxError, tokenize.TokenError) as exc:
+            # Reported whatever is selected, as nothing else is checked
+            code = 'E902' if isinstance(exc, tokenize.TokenError) else 'E999'
+            row, col = checker.FileChecker._extract_syntax_information(exc)
+            run.report((row, col, '%s %s: %s' % (code, type(exc).__name__,
+                                                 exc.args[0])))
+        results = [result for result in run.results
+                   if result[0] in ('E902', 'E999') or
+                   self.is_selected(result[0])]
+        results.sort(key=operator.itemgetter(1, 2))
+        return file_processor.filename, results
+
+
+class FileRun:
+    """The checks running on a file.
+
+    This goes through the tokens of the file the way flake8 does, so that
+    the checks get the same logical and physical lines.
+    """
+
+    def __init__(self, checker: Checker,
+                 file_processor: processor.FileProcessor) -> None:
+        self.checker = checker
+        self.processor = file_processor
+        self.results: list[tuple] = []
+
+    def report(self, result: tuple[int, int, str]) -> None:
+        row, col, text = result
+        code, text = text.split(' ', 1)
+        self.results.append(
+            (code, row, col, text, self.processor.noqa_line_for(row)))
+
+    def _get_arguments(self, names: tuple[str, ...]) -> list[Any]:
+        return [getattr(self.processor, name) for name in names]
+
+    def run_tree_checks(self) -> None:
+        tree = self.processor.build_ast()
+        for check, names in self.checker.tree:
+            plugin = check(tree, *self._get_arguments(names))
+            for row, col, text, _ in plugin.run():
+                self.report((row, col, text))
+
+    def run_logical_checks(self) -> None:
+        _, logical_line, mapping = self.processor.build_logical_line()
+        if not mapping:
+            return
+        self.processor.update_state(mapping)
+        for check, names in self.checker.logical_line:
+            for offset, text in check(logical_line,
+                                      *self._get_arguments(names)) or ():
+                row, col = checker.find_offset(offset, mapping)
+                self.report((row, col, text))
+        self.processor.next_logical_line()
+
+    def run_physical_checks(self, physical_line: str) -> None:
+        row = self.processor.line_number
+        for check, names in self.checker.physical_line:
+            result = check(physical_line, *self._get_arguments(names))
+            if result is None:
+                continue
+            try:
+                single = isinstance(result[0], int)
+            except (IndexError, TypeError):
+                single = False
+            for col, text in (result,) if single else result:
+                self.report((row, col, text))
+
+    def process_tokens(self) -> None:
+        file_processor = self.processor
+        parens = 0
+        prev_physical = ''
+        for token in file_processor.generate_tokens():
+            self.check_physical_eol(token, prev_physical)
+            token_type, text = token[0:2]
+            if token_type == tokenize.OP:
+                parens = processor.count_parentheses(parens, text)
+            elif parens == 0 and processor.token_is_newline(token):
+                self.handle_newline(token_type)
+            prev_physical = token[4]
+        if file_processor.tokens:
+            self.run_physical_checks(file_processor.lines[-1])
+            self.run_logical_checks()
+
+    def handle_newline(self, token_type: int) -> None:
+        if token_type == tokenize.NEWLINE:
+            self.run_logical_checks()
+            self.processor.reset_blank_before()
+        elif len(self.processor.tokens) == 1:
+            self.processor.visited_new_blank_line()
+            self.processor.delete_first_token()
+        else:
+            self.run_logical_checks()
+
+    def check_physical_eol(self, token: tokenize.TokenInfo,
+                           prev_physical: str) -> None:
+        if token.type == checker.FSTRING_START:
+            self.processor.fstring_start(token.start[0])
+        elif token.type == checker.TSTRING_START:
+            self.processor.tstring_start(token.start[0])
+        elif processor.is_eol_token(token):
+            self.run_physical_checks(token.line or prev_physical)
+        elif processor.is_multiline_string(token):
+            for line in self.processor.multiline_string(token):
+                self.run_physical_checks(line)
+
+
+# The checker of the worker processes
+_checker: Checker | None = None
+
+
+def _init_worker(options: argparse.Namespace) -> None:
+    global _checker
+    if _checker is None:
+        # Not inherited from the main process
+        _checker = make_checker(options)
+
+
+def _check_file(filename: str) -> tuple[str, list[tuple]]:
+    assert _checker is not None
+    return _checker.check_file(filename)
+
+
+def make_checker(options: argparse.Namespace) -> Checker:
+    return Checker(options.select, options.ignore, options.enable_extensions)
+
+
+def run(options: argparse.Namespace,
+        output: Any = sys.stdout) -> int:
+    """Check the files and print the problems found, returning how many."""
+    global _checker
+    filenames = sorted(discover_files.expand_paths(
+        paths=options.paths, stdin_display_name='stdin',
+        filename_patterns=options.filename, exclude=options.exclude))
+    core.warm_up(options.paths)
+    _checker = make_checker(options)
+
+    pool = None
+    results: Iterable[tuple[str, list[tuple]]]
+    if options.jobs > 1 and len(filenames) > 1 and '-' not in filenames:
+        pool = multiprocessing.Pool(min(options.jobs, len(filenames)),
+                                    _init_worker, (options,))
+        results = pool.imap(_check_file, filenames)
+    else:
+        results = map(_checker.check_file, filenames)
+
+    count = 0
+    try:
+        for filename, problems in results:
+            for code, row, col, text, physical_line in problems:
+                problem = violation.Violation(
+                    code, filename, row, col + 1, text, physical_line)
+                if problem.is_inline_ignored(disable_noqa=False):
+                    continue
+                count += 1
+                output.write(options.format % {
+                    'path': filename, 'row': row, 'col': col + 1,
+                    'code': code, 'text': text} + '\n')
+            output.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return count
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    options = get_parser().parse_args(argv)
+    return 1 if run(options) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,18 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+from unittest import mock
+
+import fixtures
+
 from hacking.checks import comments
 from hacking import tests
 
 
 class CoreTestCase(tests.TestCase):
+    def _run_check(self, checker, lines):
+        return [e[:3] for e in checker(None, None, lines).run()]
+
     def test_H102_none(self):
         """Verify that the H102 check finds an SPDX header"""
         self.assertEqual(
-            (0, 'H102: Apache 2.0 license header not found'),
-            comments.hacking_has_license(
-                None,
-                None,
+            [(1, 0, 'H102: Apache 2.0 license header not found')],
+            self._run_check(
+                comments.HasLicenseCheck,
                 [
                     '# foo',
                     '# bar',
@@ -39,15 +46,13 @@ class CoreTestCase(tests.TestCase):
                     '# foo',
                     '# bar',
                 ],
-                1,
             ),
         )
 
     def test_H102_full(self):
         """Verify that the H102 check finds an SPDX header"""
-        self.assertIsNone(comments.hacking_has_license(
-            None,
-            None,
+        self.assertEqual([], self._run_check(
+            comments.HasLicenseCheck,
             [
                 '# foo',
                 '# Licensed under the Apache License, Version 2.0',
@@ -62,14 +67,12 @@ class CoreTestCase(tests.TestCase):
                 '# foo',
                 '# bar',
             ],
-            1,
         ))
 
     def test_H102_SPDX(self):
         """Verify that the H102 check finds an SPDX header"""
-        self.assertIsNone(comments.hacking_has_license(
-            None,
-            None,
+        self.assertEqual([], self._run_check(
+            comments.HasLicenseCheck,
             [
                 '# foo',
                 '# SPDX-License-Identifier: Apache-2.0',
@@ -84,13 +87,12 @@ class CoreTestCase(tests.TestCase):
                 '# foo',
                 '# bar',
             ],
-            1,
         ))
 
     def test_H103_full_fail(self):
         """Verify that the H103 check finds an SPDX header"""
         self.assertEqual(
-            (2, 'H103: Header does not match Apache 2.0 License notice\n'
+            [(1, 2, 'H103: Header does not match Apache 2.0 License notice\n'
                 '<license>!=<apache2>:\n'
                 '\'Licensed under the Apache License, Version 2.0 foo bar foo '
                 'bar foo bar foo bar foo bar\' !=\n'
@@ -103,10 +105,9 @@ class CoreTestCase(tests.TestCase):
                 'BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either '
                 'express or implied. See the License for the specific '
                 'language governing permissions and limitations under the '
-                'License.\''),
-            comments.hacking_has_correct_license(
-                None,
-                None,
+                'License.\'')],
+            self._run_check(
+                comments.HasCorrectLicenseCheck,
                 [
                     '# foo',
                     '# Licensed under the Apache License, Version 2.0',
@@ -121,15 +122,13 @@ class CoreTestCase(tests.TestCase):
                     '# foo',
                     '# bar',
                 ],
-                1,
             ),
         )
 
     def test_H103_full(self):
         """Verify that the H103 check finds an SPDX header"""
-        self.assertIsNone(comments.hacking_has_correct_license(
-            None,
-            None,
+        self.assertEqual([], self._run_check(
+            comments.HasCorrectLicenseCheck,
             [
                 """
 #    Licensed under the Apache License, Version 2.0 (the "License"); you may
@@ -145,14 +144,12 @@ class CoreTestCase(tests.TestCase):
 #    under the License.
                 """  # noqa
             ],
-            1,
         ))
 
     def test_H103_SPDX(self):
         """Verify that the H103 check finds an SPDX header"""
-        self.assertIsNone(comments.hacking_has_correct_license(
-            None,
-            None,
+        self.assertEqual([], self._run_check(
+            comments.HasCorrectLicenseCheck,
             [
                 '# foo',
                 '# SPDX-License-Identifier: Apache-2.0',
@@ -167,70 +164,174 @@ class CoreTestCase(tests.TestCase):
                 '# foo',
                 '# bar',
             ],
-            1,
         ))
 
     def test_H104_regex(self):
         """Verify that the H104 regex matches correct lines."""
-        self.assertTrue(comments.hacking_has_only_comments(
-            None,
-            None,
+        self.assertTrue(self._run_check(
+            comments.OnlyCommentsCheck,
             ['# foo',
-             '# bar'],
-            1))
-        self.assertTrue(comments.hacking_has_only_comments(
-            None,
-            None,
+             '# bar']))
+        self.assertTrue(self._run_check(
+            comments.OnlyCommentsCheck,
             ['# foo',
              '# bar',
-             ''],
-            1))
-        self.assertTrue(comments.hacking_has_only_comments(
-            None,
-            None,
+             '']))
+        self.assertTrue(self._run_check(
+            comments.OnlyCommentsCheck,
             ['# foo',
              '   ',
-             '# bar'],
-            1))
+             '# bar']))
 
-        self.assertIsNone(comments.hacking_has_only_comments(
-            None,
-            None,
+        self.assertEqual([], self._run_check(
+            comments.OnlyCommentsCheck,
             ['# foo',
              '   ',
-             '"""foobar"""'],
-            1))
-        self.assertIsNone(comments.hacking_has_only_comments(
-            None,
-            None,
+             '"""foobar"""']))
+        self.assertEqual([], self._run_check(
+            comments.OnlyCommentsCheck,
             ['# foo',
              '',
-             'print(42)'],
-            1))
-        self.assertIsNone(comments.hacking_has_only_comments(
-            None,
-            None,
-            ['# foo'],
-            100))
+             'print(42)']))
+        self.assertEqual([], self._run_check(
+            comments.OnlyCommentsCheck,
+            []))
 
     def test_H105(self):
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# @author: Foo Bar'))
+        for line in ('# @author: Foo Bar',
+                     '# @Author: Foo Bar',
+                     '# author: Foo Bar',
+                     '# authors: Foo Bar',
+                     '# Author: Foo Bar',
+                     '# Authors: Foo Bar',
+                     '.. moduleauthor:: Foo Bar'):
+            self.assertTrue(self._run_check(
+                comments.NoAuthorTagsCheck, [line]), line)
+
+    def test_H105_position(self):
+        self.assertEqual(
+            [(2, 2, "H105: Don't use author tags"),
+             (4, 3, "H105: Don't use author tags")],
+            self._run_check(
+                comments.NoAuthorTagsCheck,
+                ['# foo\n',
+                 '# Author: Foo Bar\n',
+                 '#\n',
+                 '.. moduleauthor:: Foo Bar\n',
+                 '#\n',
+                 '# @author is not a tag\n']))
+
+    def test_H102_H103_header_window(self):
+        lines = ['# foo\n'] * 60 + ['# Licensed under the Apache License\n']
+        self.assertEqual(
+            [(1, 0, 'H102: Apache 2.0 license header not found')],
+            self._run_check(comments.HasLicenseCheck, lines))
+        self.assertEqual(
+            [], self._run_check(comments.HasCorrectLicenseCheck, lines))
+
+    def test_H103_SPDX_fast_path(self):
+        lines = ['# SPDX-License-Identifier: Apache-2.0\n',
+                 '# Licensed under the Apache License, not quite\n']
+        lines += ['# foo\n'] * 10
+        with mock.patch.object(comments, '_check_for_exact_apache') as m:
+            self.assertEqual(
+                [], self._run_check(comments.HasCorrectLicenseCheck, lines))
+        m.assert_not_called()
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# @Author: Foo Bar'))
+    def test_project_is_apache(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        for project, license in (('apache', 'Apache License\n'),
+                                 ('mit', 'MIT License\n'),
+                                 ('none', None)):
+            os.makedirs(os.path.join(root, project, 'pkg'))
+            open(os.path.join(root, project, 'setup.py'), 'w').close()
+            if license:
+                with open(os.path.join(root, project, 'LICENSE'), 'w') as f:
+                    f.write(license)
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# author: Foo Bar'))
+        self.assertTrue(comments._project_is_apache(
+            os.path.join(root, 'apache', 'pkg', 'mod.py')))
+        self.assertFalse(comments._project_is_apache(
+            os.path.join(root, 'mit', 'pkg', 'mod.py')))
+        self.assertFalse(comments._project_is_apache(
+            os.path.join(root, 'none', 'pkg', 'mod.py')))
+
+    def test_physical_line_functions(self):
+        lines = ['# foo\n'] * 11 + ['# Author: Foo Bar\n']
+        with mock.patch.object(comments, '_project_is_apache',
+                               return_value=True):
+            self.assertEqual(
+                (0, 'H102: Apache 2.0 license header not found'),
+                comments.hacking_has_license(lines[0], 'foo.py', lines, 1))
+            self.assertIsNone(
+                comments.hacking_has_license(lines[1], 'foo.py', lines, 2))
+            self.assertIsNone(comments.hacking_has_correct_license(
+                lines[0], 'foo.py', lines, 1))
+            self.assertEqual(
+                (0, 'H104: File contains nothing but comments'),
+                comments.hacking_has_only_comments(
+                    lines[0], 'foo.py', lines, 1))
+        self.assertEqual((2, "H105: Don't use author tags"),
+                         comments.hacking_no_author_tags(lines[-1]))
+        self.assertIsNone(comments.hacking_no_author_tags(lines[0]))
+
+    def test_H103_every_notice(self):
+        notice = comments.APACHE2.strip().splitlines(True)
+        header = ['# %s' % line for line in notice]
+        wrong = ['# Licensed under the Apache License, Version 2.0\n',
+                 '# but not quite\n']
+        lines = header + ['\n'] + wrong + ['x = 1\n'] * 10
+        errors = self._run_check(comments.HasCorrectLicenseCheck, lines)
+        self.assertEqual(1, len(errors))
+        self.assertEqual((1, 2), errors[0][:2])
+        self.assertTrue(errors[0][2].startswith(
+            'H103: Header does not match Apache 2.0 License notice\n'
+            "<license>!=<apache2>:\n'Licensed under the Apache License, "
+            "Version 2.0 but not quite x = 1"))
+        self.assertEqual(
+            [], self._run_check(comments.HasCorrectLicenseCheck,
+                                header + ['\n'] + header))
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# authors: Foo Bar'))
+    def test_project_is_apache_nested(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        repo = os.path.join(root, 'repo')
+        for directory in ('.git', os.path.join('sub', 'pkg')):
+            os.makedirs(os.path.join(repo, directory))
+        open(os.path.join(repo, 'sub', 'setup.py'), 'w').close()
+        # only the license files up to the root of the repository count
+        with open(os.path.join(root, 'LICENSE'), 'w') as f:
+            f.write('Apache License\n')
+        filename = os.path.join(repo, 'sub', 'pkg', 'mod.py')
+        self.assertFalse(comments._project_is_apache(filename))
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# Author: Foo Bar'))
+        os.makedirs(os.path.join(root, 'other', '.git'))
+        os.makedirs(os.path.join(root, 'other', 'sub', 'pkg'))
+        open(os.path.join(root, 'other', 'sub', 'tox.ini'), 'w').close()
+        with open(os.path.join(root, 'other', 'LICENSE'), 'w') as f:
+            f.write('Apache License\n')
+        self.assertTrue(comments._project_is_apache(
+            os.path.join(root, 'other', 'sub', 'pkg', 'mod.py')))
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '# Authors: Foo Bar'))
+    def test_project_is_apache_outside_git(self):
+        # e.g. an sdist: nested projects do not stop the search
+        root = self.useFixture(fixtures.TempDir()).path
+        os.makedirs(os.path.join(root, 'lib', 'sub', 'pkg'))
+        for directory in ('', 'lib', os.path.join('lib', 'sub')):
+            open(os.path.join(root, directory, 'setup.py'), 'w').close()
+        with open(os.path.join(root, 'LICENSE'), 'w') as f:
+            f.write('Apache License\n')
+        self.assertTrue(comments._project_is_apache(
+            os.path.join(root, 'lib', 'sub', 'pkg', 'mod.py')))
 
-        self.assertTrue(comments.hacking_no_author_tags(
-            '.. moduleauthor:: Foo Bar'))
+    def test_header_lines_option(self):
+        for value, header_lines in (('30', 30), ('', comments.HEADER_LINES),
+                                    ('fifty', comments.HEADER_LINES),
+                                    ('0', comments.HEADER_LINES),
+                                    ('-1', comments.HEADER_LINES)):
+            conf = mock.Mock()
+            conf.get.return_value = value
+            with mock.patch('warnings.warn') as warn:
+                self.assertEqual(header_lines,
+                                 comments._read_header_lines(conf))
+            self.assertEqual(header_lines != 30 and bool(value),
+                             warn.called)
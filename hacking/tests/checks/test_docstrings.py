@@ -0,0 +1,44 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import tokenize
+
+from hacking.checks import docstrings
+from hacking import tests
+
+
+class DocstringsTestCase(tests.TestCase):
+    """This tests hacking checks from the 'docstrings' group."""
+
+    def _get_tokens(self, source):
+        return list(tokenize.generate_tokens(io.StringIO(source).readline))
+
+    def test_get_docstring(self):
+        tokens = self._get_tokens("    r'''\n    foo\n\n    bar'''\n")
+
+        docstring = docstrings.get_docstring(tokens, 'def foo():')
+
+        self.assertEqual("r'''", docstring.start_triple)
+        self.assertEqual(["r'''", '    foo', '', "    bar'''"],
+                         docstring.lines)
+        self.assertIs(docstring,
+                      docstrings.get_docstring(tokens, 'class Foo:'))
+
+    def test_get_docstring_not_a_docstring(self):
+        tokens = self._get_tokens("'''foo'''\n")
+        self.assertIsNone(docstrings.get_docstring(tokens, 'x = 1'))
+
+        tokens = self._get_tokens("x = '''foo'''\n")
+        self.assertIsNone(docstrings.get_docstring(tokens, 'def foo():'))
+        self.assertFalse(docstrings.is_docstring(tokens, 'def foo():'))
@@ -11,6 +11,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import ast
 import textwrap
 from unittest import mock
 
@@ -244,3 +245,141 @@ class ExceptChecksTest(tests.TestCase):
                 "self.assertTrue()"
             ))),
             0)
+
+    def test_scan_line(self):
+        self.assertEqual(frozenset(), except_checks.scan_line('x = 1'))
+        self.assertEqual(
+            frozenset(['H202', 'H213', 'H906']),
+            except_checks.scan_line(
+                "self.assertRaises(Exception, self.assertRaisesRegexp(x), "
+                "LOG.warn('foo'))"))
+        self.assertEqual(
+            frozenset(['H211', 'H212', 'H214', 'H215']),
+            except_checks.scan_line(
+                "self.assertTrue(isinstance(a, b)); "
+                "self.assertEqual(type(a), b); "
+                "self.assertFalse(a in b, 'message'); "
+                "self.assertEqual(True, a in b)"))
+
+    def test_scan_line_message_needs_closing_paren(self):
+        self.assertEqual(frozenset(['H214']),
+                         except_checks.scan_line("assertTrue(a in b, x)"))
+        self.assertEqual(frozenset(),
+                         except_checks.scan_line("assertTrue(a in b, x"))
+        self.assertEqual(frozenset(),
+                         except_checks.scan_line("x.assertRaises(Exception)"))
+
+    def test_scanner_checks_share_scan(self):
+        line = "self.assertEqual(type(a), b)"
+        with mock.patch.object(except_checks, 'RE_LINE_SCANNER',
+                               wraps=except_checks.RE_LINE_SCANNER) as m:
+            except_checks.scan_line.cache_clear()
+            self.assertEqual(1, len(list(
+                except_checks.hacking_assert_equal_type(line))))
+            self.assertEqual([], list(
+                except_checks.hacking_assert_equal_in(line)))
+            self.assertEqual([], list(
+                except_checks.hacking_except_format_assert(line, None)))
+        self.assertEqual(1, m.finditer.call_count)
+
+    def _run_tree_check(self, code, checker):
+        code = textwrap.dedent(code)
+        tree = ast.parse(code)
+        lines = code.splitlines(True)
+        return [e[:3] for e in checker(tree, lines).run()]
+
+    def test_assertion_style_checks(self):
+        code = """
+               self.assertEqual(None, foo)
+               self.assertTrue(foo ==
+                               bar)
+               if foo:
+                   self.assertFalse(foo >= bar)
+               """
+        self.assertEqual(
+            [(2, 5, "H203: Use assertIs(Not)None to check for None")],
+            self._run_tree_check(code, except_checks.AssertIsNoneCheck))
+        self.assertEqual(
+            [(3, 5, "H204: Use assert(Not)Equal()")],
+            self._run_tree_check(code, except_checks.AssertEqualCheck))
+        self.assertEqual(
+            [(6, 9, "H205: Use assert{Greater,Less}[Equal]")],
+            self._run_tree_check(code, except_checks.AssertGreaterLessCheck))
+
+    def test_assertion_style_checks_once_per_statement(self):
+        code = """
+               self.assertEqual(None, self.assertEqual(foo, None))
+               if self.assertTrue(foo == bar):
+                   pass
+               """
+        self.assertEqual(
+            [(2, 5, "H203: Use assertIs(Not)None to check for None")],
+            self._run_tree_check(code, except_checks.AssertIsNoneCheck))
+        self.assertEqual(
+            [], self._run_tree_check(code, except_checks.AssertEqualCheck))
+
+    def test_assertion_style_checks_share_tree_walk(self):
+        lines = ["self.assertTrue(foo == bar)\n"]
+        tree = ast.parse(lines[0])
+        with mock.patch.object(except_checks, 'AssertionCallChecker',
+                               wraps=except_checks.AssertionCallChecker) as m:
+            for checker in (except_checks.AssertIsNoneCheck,
+                            except_checks.AssertEqualCheck,
+                            except_checks.AssertGreaterLessCheck):
+                list(checker(tree, lines).run())
+        m.assert_called_once_with(lines)
+
+    def test_assertion_style_checks_once_per_logical_line(self):
+        code = """
+               self.assertEqual(1, 2); self.assertEqual(None, 1)
+               self.assertFalse(a); self.assertTrue(
+                   b) or self.assertTrue(c < d)
+               """
+        self.assertEqual(
+            [(2, 5, "H203: Use assertIs(Not)None to check for None")],
+            self._run_tree_check(code, except_checks.AssertIsNoneCheck))
+        self.assertEqual(
+            [(3, 26, "H205: Use assert{Greater,Less}[Equal]")],
+            self._run_tree_check(code, except_checks.AssertGreaterLessCheck))
+
+    def test_assertion_style_checks_skip_unparsable_lines(self):
+        code = """
+               try: self.assertTrue(a < b)
+               except Exception: self.assertIs(None, 1)
+               else: self.assertTrue(a < b)
+               finally: self.assertTrue(a < b)
+               if foo: self.assertTrue(a < b)
+               elif bar: self.assertTrue(a < b)
+               else:
+                   self.assertTrue(a < b)
+               match foo:
+                   case 1: self.assertTrue(a < b)
+               @dec(self.assertTrue(a < b))
+               def f(self): pass
+               """
+        self.assertEqual(
+            [], self._run_tree_check(code, except_checks.AssertIsNoneCheck))
+        self.assertEqual(
+            [(6, 13, "H205: Use assert{Greater,Less}[Equal]"),
+             (9, 9, "H205: Use assert{Greater,Less}[Equal]")],
+            self._run_tree_check(code, except_checks.AssertGreaterLessCheck))
+
+    def test_assertion_style_logical_line_functions(self):
+        self.assertEqual(
+            [(5, "H203: Use assertIs(Not)None to check for None")],
+            list(except_checks.hacking_assert_is_none(
+                "self.assertEqual(None, 'foo')", None)))
+        self.assertEqual(
+            [], list(except_checks.hacking_assert_is_none(
+                "self.assertEqual(None, 'foo')", '# noqa')))
+        self.assertEqual(
+            [(9, 'H204: Use assert(Not)Equal()')],
+            list(except_checks.hacking_assert_equal(
+                "foo(self.assertTrue(x == y))", None)))
+        self.assertEqual(
+            [(5, 'H205: Use assert{Greater,Less}[Equal]')],
+            list(except_checks.hacking_assert_greater_less(
+                "self.assertFalse(x < y)", None)))
+        self.assertEqual(
+            [], list(except_checks.hacking_assert_greater_less(
+                "if self.assertFalse(x < y):", None)))
@@ -0,0 +1,164 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import subprocess
+import sys
+import textwrap
+
+import fixtures
+from flake8 import style_guide
+
+from hacking.checks import fused
+from hacking import tests
+
+
+SOURCE = textwrap.dedent('''\
+    import sys
+    import abc
+    from .foo import bar
+    import eventlet
+    import mock
+
+
+    def foo(self):
+        """ A docstring.
+        Without a summary line.
+        """
+        x = (1,  # TODO fix this
+             2)
+        try:
+            self.assertTrue(isinstance(a, b))
+            self.assertEqual(type(a), b)
+            self.assertRaises(Exception, foo)
+            self.assertFalse(a in b, 'message')
+            self.assertEqual(True, a in b)
+        except:
+            LOG.warn('%s' % self.__dict__)
+        print(_('%s %s') % (a, b), _(''), locals())
+    ''')
+
+
+class FusedChecksTest(tests.TestCase):
+    def _get_checks(self, kind, fused_checks, *args):
+        checks = fused.FusedChecks(fused_checks.name, kind,
+                                   fused_checks.parameters,
+                                   fused_checks.get_gate)
+        checks.load()
+        checks.compile(*args)
+        return checks
+
+    def _get_dispatch(self, *args):
+        checks = self._get_checks('logical_line', fused.LOGICAL_LINE_CHECKS,
+                                  *args)
+        return [check.__name__ for _, check, _ in checks.dispatch]
+
+    def test_compile(self):
+        names = self._get_dispatch()
+
+        self.assertIn('hacking_except_format', names)
+        self.assertIn('hacking_import_alphabetical', names)
+        # off by default
+        self.assertNotIn('hacking_no_eventlet', names)
+        self.assertNotIn('hacking_delayed_string_interpolation', names)
+
+    def test_compile_leaves_enabled_plugins_to_flake8(self):
+        names = self._get_dispatch(frozenset(['H201', 'H905']))
+
+        self.assertNotIn('hacking_except_format', names)
+        self.assertNotIn('hacking_no_eventlet', names)
+        self.assertIn('hacking_except_format_assert', names)
+
+    def _get_selected(self, select=None, ignore=None):
+        options = argparse.Namespace(
+            select=select, extend_select=None, ignore=ignore,
+            extend_ignore=None, extended_default_select=['H', 'HP'],
+            extended_default_ignore=[])
+        decider = style_guide.DecisionEngine(options)
+        return self._get_dispatch(frozenset(), decider)
+
+    def test_compile_selected_checks(self):
+        names = self._get_selected(select=['H2', 'H70'])
+
+        self.assertIn('hacking_except_format', names)
+        self.assertIn('hacking_localization_strings', names)
+        self.assertNotIn('hacking_import_rules', names)
+        self.assertNotIn('hacking_no_locals', names)
+
+    def test_compile_check_reporting_other_codes(self):
+        self.assertEqual(['hacking_import_rules'],
+                         self._get_selected(select=['H304']))
+        # H212 reports its violations as H211
+        self.assertEqual(
+            ['hacking_assert_true_instance', 'hacking_assert_equal_type'],
+            self._get_selected(select=['H211']))
+        self.assertNotIn('hacking_assert_equal_type',
+                         self._get_selected(ignore=['H211']))
+
+    def test_compile_physical_line_checks(self):
+        checks = self._get_checks('physical_line', fused.PHYSICAL_LINE_CHECKS)
+        gates = {check.__name__: gate for gate, check, _ in checks.dispatch}
+
+        self.assertEqual('todo', gates['hacking_todo_format'])
+        self.assertEqual('docstring', gates['hacking_docstring_summary'])
+        self.assertNotIn('NoCarriageReturnCheck', gates)
+        self.assertFalse(checks.ungated)
+
+    def test_parse_options_default_selection(self):
+        checks = fused.FusedChecks('H', 'logical_line',
+                                   fused.LOGICAL_LINE_CHECKS.parameters,
+                                   fused.LOGICAL_LINE_CHECKS.get_gate)
+        checks.load()
+        checks.enabled = True
+        options = argparse.Namespace(
+            select=None, extend_select=None, ignore=None, extend_ignore=None,
+            extended_default_select=['C90', 'H', 'HP', 'H905'],
+            extended_default_ignore=[], filenames=[])
+        checks.parse_options(options)
+
+        selected = options.extended_default_select
+        self.assertNotIn('H', selected)
+        self.assertIn('HP', selected)
+        self.assertIn('H301', selected)
+        self.assertIn('H700', selected)
+        self.assertNotIn('H904', selected)
+        self.assertEqual(1, selected.count('H905'))
+        names = [check.__name__ for _, check, _ in checks.dispatch]
+        self.assertIn('hacking_import_rules', names)
+        # H700 is selected, but none of the codes it reports are
+        self.assertNotIn('hacking_localization_strings', names)
+
+    def _run_flake8(self, tox_ini, *args):
+        directory = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(directory, 'tox.ini'), 'w') as f:
+            f.write(tox_ini)
+        with open(os.path.join(directory, 'example.py'), 'w') as f:
+            f.write(SOURCE)
+        cmd = [sys.executable, '-mflake8',
+               '--format=%(row)d:%(col)d:%(code)s %(text)s', 'example.py']
+        return subprocess.run(cmd + list(args), cwd=directory,
+                              stdout=subprocess.PIPE,
+                              universal_newlines=True).stdout
+
+    def test_same_results(self):
+        for args in [('--select=H',),
+                     ('--select=H', '--enable-extensions=H201,H905'),
+                     ('--select=H3,H70', '--ignore=H303'),
+                     # the default selection
+                     (), ('--enable-extensions=H905',)]:
+            expected = self._run_flake8('[flake8]\n', *args)
+            self.assertNotEqual('', expected)
+            self.assertEqual(
+                expected,
+                self._run_flake8('[hacking]\nfused_checks = true\n', *args))
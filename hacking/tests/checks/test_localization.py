@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import tokenize
+from unittest import mock
+
+import ddt
+
+from hacking.checks import localization
+from hacking import tests
+
+
+def _tokens(source):
+    return list(tokenize.generate_tokens(io.StringIO(source).readline))
+
+
+@ddt.ddt
+class LocalizationTestCase(tests.TestCase):
+    """This tests hacking checks from the 'localization' group."""
+
+    @ddt.unpack
+    @ddt.data(
+        (None, 'foo = bar("%s %s" % (a, b))\n'),
+        (None, '_("This is fine")\n'),
+        (None, '_(\n    "This is "\n    "fine %s")\n'),
+        (None, 'def _(msg):\n    _("")\n'),
+        (None, '_ = foo\n'),
+        ('H701: Empty localization string', '_(foo)\n'),
+        ('H701: Invalid localization call', '_("foo" "bar" foo)\n'),
+        ('H702: Formatting operation should be outside of localization '
+         'method call', '_LE("Bob %s" % foo)\n'),
+        ('H703: Multiple positional placeholders',
+         'x = 1 + _("%s " "%s") % (a, b)\n'),
+        ('H702: Argument to _, _LI, _LW, _LC, or _LE must be just a string',
+         'x = _(f"foo")\n'),
+        ('H702: Argument to _, _LI, _LW, _LC, or _LE must be just a string',
+         'x = _("foo" F"{bar}")\n'),
+        ('H702: Argument to _, _LI, _LW, _LC, or _LE must be just a string',
+         'x = _(b"foo")\n'),
+    )
+    def test_check_i18n(self, message, source):
+        error = localization.check_i18n(_tokens(source))
+        if message is None:
+            self.assertIsNone(error)
+        else:
+            self.assertEqual(message, error[1])
+
+    def test_check_i18n_offset(self):
+        self.assertEqual(((1, 10), 'H701: Empty localization string'),
+                         localization.check_i18n(_tokens("x = _LI('')\n")))
+
+    def test_only_literals_are_decoded(self):
+        with mock.patch('builtins.eval') as m:
+            self.assertEqual(
+                'H701: Invalid localization call',
+                localization.check_i18n(_tokens('_("a" foo)\n'))[1])
+        m.assert_not_called()
+        self.assertIsNone(localization.decode_string('__import__("os")'))
+
+    @ddt.data('f"foo"', 'Rb"foo"', '"foo" + "bar"', '"foo', '1')
+    def test_decode_string_not_a_plain_string(self, text):
+        self.assertIsNone(localization.decode_string(text))
+
+    def test_format_string_not_scanned_without_call(self):
+        with mock.patch.object(localization, 'FORMAT_RE') as m:
+            localization.check_i18n(_tokens('foo("%s %s")\n'))
+        m.findall.assert_not_called()
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import ast
+
 import ddt
 
 from hacking.checks import mock_checks
@@ -35,3 +37,35 @@ class MockingTestCase(tests.TestCase):
         else:
             self.assertCheckPasses(mock_checks.hacking_no_third_party_mock,
                                    line, noqa)
+
+    @ddt.unpack
+    @ddt.data(
+        (1, 'import mock\nmock.patch("a")\n'),
+        (1, 'from unittest import mock\nmock.patch.object(a, "b")\n'),
+        (1, 'from os import *\nmock.patch("a")\n'),
+        (1, 'mock.patch("a")\n'),
+        (1, 'import os\nmock.patch.object(a, "b")\n'),
+        (0, 'import os\nos.patch("a")\n'))
+    def test_H210_without_mock_import(self, err_count, source):
+        tree = ast.parse(source)
+        checker = mock_checks.MockAutospecCheck(tree, 'foo.py')
+        self.assertEqual(err_count, len(list(checker.run())))
+
+    @ddt.unpack
+    @ddt.data(
+        ([(2, 0)], 'from unittest import mock as m\nm.patch("a")\n'),
+        ([(2, 0)], 'from unittest.mock import patch\npatch("a")\n'),
+        ([(2, 0)], 'from mock import patch as p\np.object(a, "b")\n'),
+        ([(2, 0)], 'import unittest\nunittest.mock.patch("a")\n'),
+        ([(2, 0)], 'import unittest.mock\nunittest.mock.patch("a")\n'),
+        ([], 'from unittest.mock import patch\npatch("a", autospec=True)\n'),
+        ([(2, 0)], 'from foo import mock\nmock.patch("a")\n'),
+        ([(2, 0)], 'from six.moves import mock\nmock.patch("a")\n'),
+        ([], 'import mock\nmock.patch.dict("a")\n'),
+        ([(3, 4), (4, 4)],
+         'import mock\ndef f():\n    mock.patch("a")\n'
+         '    mock.patch("b")\n'))
+    def test_H210_resolves_aliases(self, expected, source):
+        checker = mock_checks.MockAutospecCheck(ast.parse(source), 'foo.py')
+        self.assertEqual(expected,
+                         sorted(error[:2] for error in checker.run()))
@@ -11,9 +11,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import os
+
 import ddt
+import fixtures
 
 from hacking.checks import other
+from hacking import core
 from hacking import tests
 
 
@@ -42,13 +47,56 @@ class OthersTestCase(tests.TestCase):
 
     @ddt.unpack
     @ddt.data(
-        (False, 'import os\r\nimport sys'),
-        (True, 'import os\nimport sys'))
-    def test_H903_hacking_no_cr(self, passes, line):
-        if passes:
-            self.assertCheckPasses(other.hacking_no_cr, line)
-        else:
-            self.assertCheckFails(other.hacking_no_cr, line)
+        (b'import os\r\nimport sys\r\n', [1, 2]),
+        (b'import os\nimport sys\r\n', [2]),
+        (b'import os\rimport sys\n\r\n', [1, 3]),
+        (b'x = 1\r\r\n', [1, 2]),
+        (b'import os\nimport sys\n', []),
+        (b'', []))
+    def test_H903_find_carriage_returns(self, data, linenos):
+        self.assertEqual(linenos, other.find_carriage_returns(data))
+
+    def _run_no_cr(self, data):
+        filename = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                'example.py')
+        with open(filename, 'wb') as f:
+            f.write(data)
+        check = other.NoCarriageReturnCheck(None, filename, [])
+        return [(row, col) for row, col, _, _ in check.run()]
+
+    def test_H903_no_cr(self):
+        self.assertEqual([(2, 0)],
+                         self._run_no_cr(b'import os\nimport sys\r\n'))
+        self.assertEqual([], self._run_no_cr(b'import os\nimport sys\n'))
+
+    def test_H903_no_cr_mmap(self):
+        self.useFixture(fixtures.MockPatchObject(other, 'MMAP_THRESHOLD', 1))
+        self.assertEqual([(1, 0), (2, 0)],
+                         self._run_no_cr(b'import os\r\nimport sys\r\n'))
+
+    def test_H903_no_cr_stdin(self):
+        check = other.NoCarriageReturnCheck(
+            None, 'stdin', ['import os\n', 'import sys\r\n'])
+        self.assertEqual([2], [row for row, _, _, _ in check.run()])
+
+    def test_H903_no_cr_stdin_display_name(self):
+        self.useFixture(fixtures.MockPatchObject(
+            other.NoCarriageReturnCheck, 'stdin', True))
+        self.assertEqual([], self._run_no_cr(b'import os\r\nimport sys\r\n'))
+
+    def test_H903_physical_line_function(self):
+        self.assertEqual(
+            [(0, "H903: Windows style line endings not allowed in code")],
+            list(other.hacking_no_cr('import os\r\n')))
+        self.assertEqual([], list(other.hacking_no_cr('import os\n')))
+
+    def test_H903_parse_options(self):
+        self.addCleanup(setattr, other.NoCarriageReturnCheck, 'stdin', False)
+        self.useFixture(fixtures.MockPatchObject(core, 'parse_options'))
+        for filenames, stdin in ((['-'], True), (['foo.py'], False)):
+            other.NoCarriageReturnCheck.parse_options(
+                argparse.Namespace(filenames=filenames))
+            self.assertEqual(stdin, other.NoCarriageReturnCheck.stdin)
 
     @ddt.unpack
     @ddt.data(
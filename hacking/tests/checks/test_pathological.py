@@ -0,0 +1,57 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ddt
+
+from hacking.checks import except_checks
+from hacking.checks import other
+from hacking import tests
+
+
+@ddt.ddt
+class PathologicalInputTestCase(tests.TestCase):
+    """The checks give the right results on huge logical lines.
+
+    Each check is run on a huge line which backtracking patterns take very
+    long to give up on, and on the same line completed so that it matches.
+    The time the checks take on such lines is measured by
+    tools/pathological_inputs.py, see "tox -e pathological".
+    """
+
+    SIZE = 100000
+
+    @ddt.unpack
+    @ddt.data(
+        (except_checks.hacking_assert_true_instance, 'H211',
+         'self.assertTrue(isinstance(%s', '%s, b))', 'a'),
+        (except_checks.hacking_assert_equal_type, 'H211',
+         'self.assertEqual(type(%s', '%sa), b)', 'a.'),
+        (except_checks.hacking_assert_true_or_false_with_in, 'H214',
+         'self.assertTrue(a in [%s', "%s'x'])", "'x', "),
+        (except_checks.hacking_assert_true_or_false_with_in, 'H214',
+         'self.assertFalse(a not in %s', '%sb)', 'b,'),
+        (except_checks.hacking_assert_equal_in, 'H215',
+         'self.assertEqual(a in %s', '%sb, True)', 'b, '),
+        (except_checks.hacking_assert_equal_in, 'H215',
+         'self.assertEqual(True, a in %s', "%s'b')", "'b', "),
+        (other.hacking_delayed_string_interpolation, 'H904',
+         'LOG.debug(%s', "%s'x' %% a)", "'x ", None),
+        (other.hacking_delayed_string_interpolation, 'H904',
+         'LOG.info({"key": %s', "%s} %% a)", "'value' ", None),
+    )
+    def test_huge_line(self, check, code, start, end, chunk, *args):
+        line = start % (chunk * self.SIZE)
+        self.assertEqual([], list(check(line, *args)))
+        line = start % (end % (chunk * self.SIZE))
+        self.assertEqual([code],
+                         [message[:4] for _, message in check(line, *args)])
@@ -0,0 +1,91 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import concurrent.futures
+import os
+import time
+
+import fixtures
+
+from hacking import cache
+from hacking import tests
+
+
+class ResultCacheTest(tests.TestCase):
+    def setUp(self):
+        super(ResultCacheTest, self).setUp()
+        self.directory = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'cache')
+
+    def _make_cache(self, max_entries=cache.DEFAULT_MAX_ENTRIES):
+        result_cache = cache.ResultCache(self.directory, max_entries)
+        self.addCleanup(result_cache.close)
+        return result_cache
+
+    def test_make_key(self):
+        key = cache.make_key(b'import os\n', ['a.py', 'settings'])
+
+        self.assertEqual(key, cache.make_key(b'import os\n',
+                                             ['a.py', 'settings']))
+        self.assertNotEqual(key, cache.make_key(b'import sys\n',
+                                                ['a.py', 'settings']))
+        self.assertNotEqual(key, cache.make_key(b'import os\n',
+                                                ['b.py', 'settings']))
+        self.assertNotEqual(key, cache.make_key(b'import os\n',
+                                                ['a.pys', 'ettings']))
+
+    def test_get_put(self):
+        result_cache = self._make_cache()
+        self.assertIsNone(result_cache.get('key'))
+
+        result_cache.put('key', [[['H101', 1, 2, 'H101: Use TODO', None]],
+                                 {'tokens': 3}])
+
+        self.assertEqual([[['H101', 1, 2, 'H101: Use TODO', None]],
+                          {'tokens': 3}],
+                         self._make_cache().get('key'))
+
+    def test_prune(self):
+        result_cache = self._make_cache(max_entries=2)
+        for key in ('one', 'two', 'three'):
+            result_cache.put(key, key)
+            time.sleep(0.01)
+        # using an entry keeps it
+        result_cache.get('one')
+
+        result_cache.prune()
+
+        self.assertEqual('one', result_cache.get('one'))
+        self.assertIsNone(result_cache.get('two'))
+        self.assertEqual('three', result_cache.get('three'))
+
+    def test_concurrent_writers(self):
+        def put(value):
+            result_cache = self._make_cache()
+            for i in range(20):
+                result_cache.put('%d-%d' % (value, i), value)
+            return True
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            self.assertTrue(all(executor.map(put, range(4))))
+        result_cache = self._make_cache()
+        self.assertEqual(3, result_cache.get('3-19'))
+
+    def test_errors_ignored(self):
+        # the cache directory is a file
+        open(self.directory, 'w').close()
+        result_cache = self._make_cache()
+
+        result_cache.put('key', 'value')
+        self.assertIsNone(result_cache.get('key'))
+        result_cache.prune()
@@ -56,3 +56,129 @@ class ConfigTest(tests.TestCase):
         self.assertEqual(['val_1', 'val_2'],
                          self.conf.get_multiple('option_4',
                                                 default=['val_1', 'val_2']))
+
+
+class FindProjectRootTest(tests.TestCase):
+    def setUp(self):
+        super(FindProjectRootTest, self).setUp()
+        self.root = self.useFixture(fixtures.TempDir()).path
+        self.project = os.path.join(self.root, 'project')
+        os.makedirs(os.path.join(self.project, 'pkg', 'sub'))
+        open(os.path.join(self.project, 'setup.cfg'), 'w').close()
+
+    def test_find_project_root(self):
+        self.assertEqual(
+            self.project,
+            config.find_project_root(
+                os.path.join(self.project, 'pkg', 'sub', 'mod.py')))
+        self.assertEqual(
+            self.project,
+            config.find_project_root(os.path.join(self.project, 'mod.py')))
+
+    def test_find_project_root_nested(self):
+        nested = os.path.join(self.project, 'pkg')
+        open(os.path.join(nested, 'pyproject.toml'), 'w').close()
+        config._find_root_from.cache_clear()
+        self.assertEqual(
+            nested,
+            config.find_project_root(os.path.join(nested, 'sub', 'mod.py')))
+
+    def test_find_project_root_stdin(self):
+        self.assertEqual(os.getcwd(), config.find_project_root('-'))
+        self.assertEqual(os.getcwd(), config.find_project_root(None))
+
+
+class ForFileTest(tests.TestCase):
+    def setUp(self):
+        super(ForFileTest, self).setUp()
+        self.root = self.useFixture(fixtures.TempDir()).path
+        self.package = os.path.join(self.root, 'pkg')
+        os.makedirs(self.package)
+        self.filename = os.path.join(self.package, 'mod.py')
+        config._find_config_in.cache_clear()
+        self.addCleanup(config._find_config_in.cache_clear)
+
+    def _write(self, name, content):
+        with open(os.path.join(self.root, name), 'w') as f:
+            f.write(content)
+
+    def test_for_file_tox_ini(self):
+        self._write('tox.ini', TEST_TOX_INI)
+        conf = config.for_file(self.filename)
+        self.assertEqual('val_1', conf.get('option_1'))
+        self.assertIs(conf, config.for_file(self.filename))
+
+    def test_for_file_setup_cfg(self):
+        self._write('tox.ini', '[testenv]\n')
+        self._write('setup.cfg', TEST_TOX_INI)
+        self.assertEqual('val_1',
+                         config.for_file(self.filename).get('option_1'))
+
+    def test_for_file_pyproject(self):
+        self._write('pyproject.toml', """
+[tool.hacking]
+option_1 = "val_1"
+option_3 = ["val_1", "val_2,val_3"]
+""")
+        conf = config.for_file(self.filename)
+        self.assertEqual('val_1', conf.get('option_1'))
+        self.assertEqual(['val_1', 'val_2', 'val_3'],
+                         conf.get_multiple('option_3'))
+
+    def test_for_file_nearest(self):
+        self._write('tox.ini', TEST_TOX_INI)
+        with open(os.path.join(self.package, 'tox.ini'), 'w') as f:
+            f.write('[hacking]\noption_1 = val_9\n')
+        self.assertEqual('val_9',
+                         config.for_file(self.filename).get('option_1'))
+
+    def test_for_file_none(self):
+        self._write('setup.py', '')
+        conf = config.for_file(self.filename)
+        self.assertEqual([], conf.items())
+        self.assertIs(conf, config.for_file(self.filename))
+
+    def test_for_file_stops_at_project_root(self):
+        self._write('tox.ini', TEST_TOX_INI)
+        open(os.path.join(self.package, 'setup.py'), 'w').close()
+        conf = config.for_file(self.filename)
+        self.assertIsNone(conf.get('option_1'))
+        self.assertEqual([], conf.items())
+
+
+class FindRepoRootTest(tests.TestCase):
+    def setUp(self):
+        super(FindRepoRootTest, self).setUp()
+        self.root = self.useFixture(fixtures.TempDir()).path
+        self.repo = os.path.join(self.root, 'repo')
+        self.project = os.path.join(self.repo, 'project')
+        os.makedirs(os.path.join(self.repo, '.git'))
+        os.makedirs(os.path.join(self.project, 'pkg'))
+        open(os.path.join(self.project, 'setup.py'), 'w').close()
+        self.filename = os.path.join(self.project, 'pkg', 'mod.py')
+
+    def test_find_repo_root(self):
+        self.assertEqual(self.repo, config.find_repo_root(self.filename))
+        outside = os.path.join(self.root, 'mod.py')
+        self.assertIsNone(config.find_repo_root(outside))
+
+    def test_find_nearest_directory(self):
+        self.assertIsNone(
+            config.find_nearest_directory(self.filename, ('LICENSE',)))
+        self.assertEqual(
+            self.project,
+            config.find_nearest_directory(self.filename, ('setup.py',)))
+        self.assertEqual(
+            self.repo,
+            config.find_nearest_directory(self.filename, ('.git',)))
+
+    def test_find_nearest_directory_outside_git(self):
+        os.rmdir(os.path.join(self.repo, '.git'))
+        open(os.path.join(self.root, 'LICENSE'), 'w').close()
+        self.assertEqual(
+            self.root,
+            config.find_nearest_directory(self.filename, ('LICENSE',)))
+        cwd = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MonkeyPatch('os.getcwd', lambda: cwd))
+        self.assertIsNone(config.find_nearest_directory(
+            os.path.join(cwd, 'mod.py'), ('LICENSE',)))
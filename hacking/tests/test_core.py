@@ -0,0 +1,229 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import ast
+import concurrent.futures
+import os
+
+import fixtures
+
+from hacking import core
+from hacking import tests
+
+
+class TriggersTest(tests.TestCase):
+    def setUp(self):
+        super(TriggersTest, self).setUp()
+        # Use a scanner only knowing about the triggers registered here
+        self.useFixture(fixtures.MockPatchObject(core, '_TRIGGERS', set()))
+        self.useFixture(fixtures.MockPatchObject(core, '_trigger_scanner'))
+        core._trigger_scanner = None
+        core.find_triggers.cache_clear()
+        self.addCleanup(core.find_triggers.cache_clear)
+
+    def test_find_triggers(self):
+        core._register_triggers(['LOG.', 'LOG.warn(', 'import'])
+
+        self.assertEqual(frozenset(), core.find_triggers('x = 1'))
+        self.assertEqual(frozenset(['LOG.']),
+                         core.find_triggers('LOG.info("foo")'))
+        self.assertEqual(frozenset(['LOG.', 'LOG.warn(']),
+                         core.find_triggers('LOG.warn("foo")'))
+        self.assertEqual(frozenset(['LOG.', 'LOG.warn(', 'import']),
+                         core.find_triggers('import LOG; LOG.warn("foo")'))
+
+    def test_prefilter(self):
+        calls = []
+
+        @core.flake8ext
+        @core.triggers('LOG.')
+        def check(logical_line, noqa):
+            calls.append(logical_line)
+            yield 0, 'H999: found'
+
+        self.assertEqual((), check('x = 1', None))
+        self.assertEqual((), check(logical_line='x = 1', noqa=None))
+        self.assertEqual([], calls)
+        self.assertEqual([(0, 'H999: found')],
+                         list(check(logical_line='LOG.info(x)', noqa=None)))
+        self.assertEqual(['LOG.info(x)'], calls)
+        self.assertEqual(frozenset(['LOG.']), check.triggers)
+        self.assertFalse(check.off_by_default)
+
+
+class RegistryTest(tests.TestCase):
+    def setUp(self):
+        super(RegistryTest, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(core, 'REGISTRY', {}))
+
+    def test_flake8ext(self):
+        @core.flake8ext
+        @core.triggers('LOG.')
+        @core.reports('H901', 'H902')
+        def hacking_log(logical_line, tokens, noqa):
+            pass
+
+        info = core.REGISTRY[__name__ + ':' + hacking_log.__qualname__]
+        self.assertEqual(('H901', 'H902'), info.codes)
+        self.assertEqual(('logical_line', 'tokens', 'noqa'), info.inputs)
+        self.assertEqual(frozenset(['LOG.']), info.triggers)
+        self.assertEqual('tokens', info.cost)
+        self.assertEqual('logical_line', info.kind)
+        self.assertIs(hacking_log, info.check)
+
+    def test_flake8ext_tree_check(self):
+        @core.flake8ext
+        class Check(object):
+            def __init__(self, tree, lines, *args):
+                pass
+
+        info = core.REGISTRY[__name__ + ':' + Check.__qualname__]
+        self.assertEqual((), info.codes)
+        self.assertEqual(('tree', 'lines'), info.inputs)
+        self.assertIsNone(info.triggers)
+        self.assertEqual('tree', info.cost)
+        self.assertEqual('tree', info.kind)
+
+    def test_get_checks(self):
+        checks = {info.name: info for info in core.get_checks()}
+
+        self.assertEqual(('H201',), checks['H201'].codes)
+        self.assertEqual(('H301', 'H303', 'H304'), checks['H301'].codes)
+        self.assertEqual('physical_line', checks['H101'].kind)
+        self.assertEqual('tokens', checks['H101'].cost)
+        self.assertEqual('line', checks['H201'].cost)
+        self.assertEqual(sorted(checks), [info.name
+                                          for info in core.get_checks()])
+
+
+class MemoizeLastTest(tests.TestCase):
+    def test_memoize_last(self):
+        calls = []
+
+        @core.memoize_last
+        def analyse(tree):
+            calls.append(tree)
+            return [tree]
+
+        one, two = object(), object()
+        self.assertIs(analyse(one), analyse(one))
+        self.assertEqual([two], analyse(two))
+        self.assertEqual([one, two], calls)
+
+    def test_memoize_last_threads(self):
+        calls = []
+
+        @core.memoize_last
+        def analyse(tree):
+            calls.append(tree)
+            return [tree]
+
+        one, two = object(), object()
+        analyse(one)
+        # another thread checking another file keeps its own cache
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            self.assertEqual([two], executor.submit(analyse, two).result())
+        self.assertEqual([one], analyse(one))
+        self.assertEqual([one, two], calls)
+
+
+class WarmUpTest(tests.TestCase):
+    def setUp(self):
+        super(WarmUpTest, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(core, '_warmed_up', set()))
+        self.useFixture(fixtures.MockPatchObject(core, 'REGISTRY', {}))
+        self.useFixture(fixtures.MockPatchObject(core, '_trigger_scanner'))
+        core._trigger_scanner = None
+        self.prepare = self.useFixture(fixtures.MockPatch(
+            'hacking.project.prepare')).mock
+        self.get_config = self.useFixture(fixtures.MockPatchObject(
+            core, 'get_config', wraps=core.get_config)).mock
+
+    def test_warm_up(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        open(os.path.join(root, 'tox.ini'), 'w').close()
+
+        core.warm_up([root])
+
+        self.assertIsNotNone(core._trigger_scanner)
+        self.prepare.assert_called_once_with((root,))
+        self.get_config.assert_called_once_with(
+            os.path.join(root, '__init__.py'))
+
+        core.warm_up([root])
+        self.prepare.assert_called_once_with((root,))
+
+    def test_parse_options(self):
+        @core.flake8ext
+        def hacking_check(logical_line):
+            pass
+
+        hacking_check.parse_options(argparse.Namespace(filenames=[]))
+        self.prepare.assert_called_once_with(('.',))
+
+
+class ImportIndexTest(tests.TestCase):
+    def test_parse_import(self):
+        self.assertIsNone(core.parse_import('x = 1'))
+        self.assertIsNone(core.parse_import('try: import mock'))
+        self.assertEqual(
+            core.ImportLine(('from', 'os', 'import', 'Path'),
+                            ('import', 'os.path')),
+            core.parse_import('from os import Path'))
+        self.assertEqual(
+            core.ImportLine(('import', 'os'), ('import', 'os')),
+            core.parse_import('  import os  '))
+
+    def test_import_index(self):
+        tree = ast.parse(
+            'import os.path\n'
+            'import json as j\n'
+            'from unittest import mock as m\n'
+            'from . import sibling\n'
+            'def f():\n'
+            '    from sys import argv\n')
+        index = core.ImportIndex(tree)
+
+        self.assertEqual(
+            {'os.path', 'json', 'unittest', 'unittest.mock', '.',
+             '.sibling', 'sys', 'sys.argv'},
+            index.modules)
+        self.assertEqual(
+            {'os': 'os', 'j': 'json', 'm': 'unittest.mock',
+             'sibling': '.sibling', 'argv': 'sys.argv'},
+            index.names)
+        self.assertFalse(index.star_import)
+
+    def test_import_index_resolve(self):
+        index = core.ImportIndex(ast.parse(
+            'from unittest import mock as m\n'
+            'import os.path\n'))
+
+        self.assertEqual('unittest.mock.patch.object',
+                         index.resolve('m.patch.object'))
+        self.assertEqual('unittest.mock', index.resolve('m'))
+        self.assertEqual('os.path.join', index.resolve('os.path.join'))
+        self.assertEqual('mock.patch', index.resolve('mock.patch'))
+
+    def test_import_index_star_import(self):
+        index = core.ImportIndex(ast.parse('from os import *\n'))
+
+        self.assertTrue(index.star_import)
+
+    def test_get_import_index(self):
+        tree = ast.parse('import os\n')
+
+        index = core.get_import_index(tree)
+        self.assertIs(index, core.get_import_index(tree))
+        self.assertIsNot(index, core.get_import_index(ast.parse('')))
@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import fixtures
+
+from hacking import diff
+from hacking import tests
+
+
+DIFF = textwrap.dedent('''\
+    diff --git a/a.py b/a.py
+    index 1111111..2222222 100644
+    --- a/a.py
+    +++ b/a.py
+    @@ -1 +1 @@
+    -import os
+    +import os, sys
+    @@ -10,0 +11,3 @@ def foo():
+    +    x = 1
+    +    y = 2
+    +    z = 3
+    @@ -20,2 +22,0 @@ def bar():
+    -    x = 1
+    -    y = 2
+    diff --git a/b.py b/b.py
+    deleted file mode 100644
+    index 3333333..0000000
+    --- a/b.py
+    +++ /dev/null
+    @@ -1 +0,0 @@
+    -import os
+    diff --git a/old.py b/new.py
+    similarity index 90%
+    rename from old.py
+    rename to new.py
+    --- a/old.py
+    +++ b/new.py
+    @@ -3,0 +4 @@
+    +import sys
+    ''')
+
+
+class DiffTest(tests.TestCase):
+    def test_parse_diff(self):
+        self.assertEqual(
+            {'a.py': [range(1, 2), range(11, 14)], 'new.py': [range(4, 5)]},
+            diff.parse_diff(DIFF))
+
+    def test_filter_results(self):
+        changes = diff.Changes('/src', {'a.py': [range(11, 14)]})
+        results = [('H301', 1, 0, 'H301: one import per line', None),
+                   ('H102', 1, 0, 'H102: license header not found', None),
+                   ('E501', 12, 79, 'E501 line too long', None),
+                   ('E501', 14, 79, 'E501 line too long', None)]
+
+        self.assertTrue(changes.is_changed('/src/a.py'))
+        self.assertFalse(changes.is_changed('/src/b.py'))
+        self.assertEqual(results[1:3],
+                         changes.filter_results('/src/a.py', results))
+        self.assertEqual(results[1:2],
+                         changes.filter_results('/src/b.py', results))
+
+
+class GitDiffTest(tests.TestCase):
+    def setUp(self):
+        super(GitDiffTest, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self._git('init', '-q')
+        self._write('a.py', 'import os\nimport sys\n')
+        self._write('b.py', 'import os\n')
+        self._git('add', 'a.py', 'b.py')
+        self._git('-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+                  'commit', '-q', '-m', 'Initial')
+
+    def _git(self, *args):
+        subprocess.run(('git',) + args, cwd=self.directory, check=True)
+
+    def _write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(content)
+
+    def test_get_changes(self):
+        self._write('a.py', 'import os\nimport json, sys\n')
+        self._write('c.py', 'import os\n')
+
+        changes = diff.get_changes('HEAD', self.directory)
+
+        self.assertEqual(
+            {os.path.join(self.directory, 'a.py'): [range(2, 3)],
+             os.path.join(self.directory, 'c.py'): [range(1, 2 ** 31)]},
+            changes.files)
+
+    def test_get_changes_bad_revision(self):
+        self.assertRaises(diff.GitError, diff.get_changes, 'no-such-ref',
+                          self.directory)
+
+    def test_runner(self):
+        self._write('b.py', 'from os import path, sep\n')
+        self._write('a.py', 'from os import path, sep\nimport os\n')
+        self._git('add', 'a.py', 'b.py')
+        self._git('-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+                  'commit', '-q', '-m', 'Change')
+        self._write('a.py', 'from os import path, sep\n'
+                            'from sys import argv, path\n')
+
+        cmd = [sys.executable, '-m', 'hacking.runner', '--select=H301',
+               '--format=%(path)s:%(row)d', '--diff-base', 'HEAD', '.']
+        output = subprocess.run(cmd, cwd=self.directory,
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        self.assertEqual('./a.py:2\n', output)
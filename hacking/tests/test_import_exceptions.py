@@ -51,3 +51,54 @@ class ImportExceptionsTest(tests.TestCase):
         conf = self._setUpConfig(TEST_TOX_INI)
         self.assertEqual(['a.b.c', 'z.x'],
                          conf.get_multiple('import_exceptions'))
+
+    def test_is_import_exception(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(root, 'tox.ini'), 'w') as tox_ini:
+            tox_ini.write(TEST_TOX_INI)
+        filename = os.path.join(root, 'foo.py')
+
+        self.assertTrue(core.is_import_exception('a.b.c', filename))
+        self.assertTrue(core.is_import_exception('a.b.c.d', filename))
+        self.assertTrue(core.is_import_exception('typing', filename))
+        self.assertFalse(core.is_import_exception('a.b', filename))
+        self.assertFalse(core.is_import_exception('z.xy', filename))
+
+    def test_import_exceptions_lookup(self):
+        import_exceptions = core.ImportExceptions(['a.b.c', 'z'])
+
+        self.assertIn('a.b.c', import_exceptions)
+        self.assertIn('a.b.c.d', import_exceptions)
+        self.assertIn('z.x.y', import_exceptions)
+        self.assertNotIn('a', import_exceptions)
+        self.assertNotIn('a.b', import_exceptions)
+        self.assertNotIn('a.b.cd', import_exceptions)
+        self.assertNotIn('zz', import_exceptions)
+        # and again, from the memoized results
+        self.assertIn('a.b.c.d', import_exceptions)
+        self.assertNotIn('a.b.cd', import_exceptions)
+
+    def test_get_import_exceptions_not_shared(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(root, 'tox.ini'), 'w') as tox_ini:
+            tox_ini.write(TEST_TOX_INI)
+        filename = os.path.join(root, 'foo.py')
+
+        import_exceptions = core.get_import_exceptions(filename)
+        self.assertEqual(['a.b.c', 'z.x'] + core.DEFAULT_IMPORT_EXCEPTIONS,
+                         import_exceptions)
+        import_exceptions.append('os')
+        self.assertNotIn('os', core.get_import_exceptions(filename))
+
+    def test_no_config_memoized(self):
+        root = self.useFixture(fixtures.TempDir()).path
+        open(os.path.join(root, 'setup.py'), 'w').close()
+        filename = os.path.join(root, 'foo.py')
+
+        self.assertIs(core.get_config(filename), core.get_config(filename))
+        self.assertTrue(core.is_import_exception('typing', filename))
+        misses = core._get_import_exception_set.cache_info().misses
+        for _ in range(3):
+            self.assertFalse(core.is_import_exception('os.path', filename))
+        self.assertEqual(misses,
+                         core._get_import_exception_set.cache_info().misses)
@@ -0,0 +1,88 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+from unittest import mock
+
+import fixtures
+
+from hacking import project
+from hacking import tests
+
+
+class ProjectTest(tests.TestCase):
+    def setUp(self):
+        super(ProjectTest, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(project, 'FACTS', []))
+        self.useFixture(fixtures.MockPatchObject(project, 'CHECKS', []))
+        self.useFixture(fixtures.MockPatchObject(
+            project.ProjectCheck, '_problems', {}))
+        self.root = os.path.realpath(self.useFixture(fixtures.TempDir()).path)
+        for name in ('one', 'two'):
+            os.makedirs(os.path.join(self.root, name, 'pkg'))
+            open(os.path.join(self.root, name, 'setup.py'), 'w').close()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_get_roots(self):
+        self.assertEqual(
+            {self._path('one'), self._path('two')},
+            project.get_roots([self._path('one'),
+                               self._path('one', 'pkg', 'mod.py'),
+                               self._path('two', 'pkg')]))
+
+    def test_fact(self):
+        m = mock.Mock(return_value=True)
+        fact = project.fact(m)
+
+        project.prepare([self._path('one'), self._path('two', 'pkg')])
+        self.assertTrue(fact(self._path('one')))
+        self.assertTrue(fact(self._path('two')))
+
+        self.assertEqual([fact], project.FACTS)
+        self.assertEqual([mock.call(self._path('one')),
+                          mock.call(self._path('two'))],
+                         sorted(m.call_args_list))
+
+    def test_project_check(self):
+        m = mock.Mock(return_value=[
+            ('pkg/mod.py', 1, 0, 'H999: problem'),
+            ('pkg/./mod.py', 2, 4, 'H999: other problem'),
+            ('setup.py', 1, 0, 'H999: setup problem')])
+
+        class Check(project.ProjectCheck):
+            check_project = m
+
+        Check.parse_options(argparse.Namespace(filenames=[self._path('one')]))
+        m.assert_called_once_with(self._path('one'))
+
+        self.assertEqual([Check], project.CHECKS)
+        self.assertEqual(
+            [(1, 0, 'H999: problem', Check),
+             (2, 4, 'H999: other problem', Check)],
+            list(Check(None, self._path('one', 'pkg', 'mod.py')).run()))
+        self.assertEqual(
+            [(1, 0, 'H999: setup problem', Check)],
+            list(Check(None, self._path('one', 'setup.py')).run()))
+        self.assertEqual(
+            [], list(Check(None, self._path('one', 'pkg', 'other.py')).run()))
+        self.assertEqual([], list(Check(None, 'stdin').run()))
+        m.assert_called_once_with(self._path('one'))
+
+        # projects not prepared are checked when first needed
+        self.assertEqual(
+            [(1, 0, 'H999: setup problem', Check)],
+            list(Check(None, self._path('two', 'setup.py')).run()))
+        self.assertEqual(2, m.call_count)
@@ -0,0 +1,73 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import fixtures
+
+from hacking import tests
+
+
+SOURCES = {
+    'a.py': 'import os, sys\n',
+    'b.py': 'try:\n    pass\nexcept:\n    pass\n',
+    'c.py': '# TODO fix\nx = locals()\n',
+    'd.py': 'def f():\n    """ Doc."""\n',
+}
+
+
+class RunnerTest(tests.TestCase):
+    def _run(self, module, tox_ini='[flake8]\n', directory=None):
+        if directory is None:
+            directory = self.useFixture(fixtures.TempDir()).path
+            for name, source in SOURCES.items():
+                with open(os.path.join(directory, name), 'w') as f:
+                    f.write(source)
+        with open(os.path.join(directory, 'tox.ini'), 'w') as f:
+            f.write(tox_ini)
+        cmd = [sys.executable, '-m', module, '--jobs=4', '--select=H', '.']
+        return subprocess.run(cmd, cwd=directory, stdout=subprocess.PIPE,
+                              universal_newlines=True)
+
+    def test_same_results(self):
+        expected = self._run('flake8')
+        self.assertEqual(1, expected.returncode)
+        self.assertNotEqual('', expected.stdout)
+
+        result = self._run('hacking.runner')
+        self.assertEqual(expected.returncode, result.returncode)
+        self.assertEqual(expected.stdout, result.stdout)
+
+    def test_cache(self):
+        expected = self._run('flake8').stdout
+        directory = self.useFixture(fixtures.TempDir()).path
+        for name, source in SOURCES.items():
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write(source)
+
+        def run():
+            return self._run('hacking.runner',
+                             '[hacking]\ncache_dir = .cache\n',
+                             directory).stdout
+
+        self.assertEqual(expected, run())
+        self.assertTrue(os.path.exists(
+            os.path.join(directory, '.cache', 'results.sqlite')))
+        self.assertEqual(expected, run())
+
+        # changed files are checked again
+        with open(os.path.join(directory, 'a.py'), 'w') as f:
+            f.write('import os\n')
+        self.assertNotIn('./a.py', run())
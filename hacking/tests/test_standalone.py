@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import fixtures
+
+from hacking import tests
+
+
+SOURCES = {
+    'a.py': 'import os, sys\nfrom . import x\n',
+    'b.py': ('try:\n    pass\nexcept:\n    pass\n'
+             'self.assertRaises(Exception, f)\n'),
+    'c.py': '# TODO fix\nx = locals()\ny = locals()  # noqa\n',
+    'd.py': 'def f():\n    """ Doc."""\n',
+}
+
+
+class StandaloneTest(tests.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        for name, source in SOURCES.items():
+            with open(os.path.join(self.directory, name), 'w') as f:
+                f.write(source)
+        with open(os.path.join(self.directory, 'tox.ini'), 'w') as f:
+            f.write('[flake8]\n')
+
+    def _run(self, module, *args):
+        cmd = [sys.executable, '-m', module] + list(args) + ['.']
+        return subprocess.run(cmd, cwd=self.directory,
+                              stdout=subprocess.PIPE,
+                              universal_newlines=True)
+
+    def test_same_results(self):
+        expected = self._run('flake8', '--select=H')
+        self.assertEqual(1, expected.returncode)
+        self.assertIn('./a.py:2:', expected.stdout)
+
+        for jobs in ('--jobs=1', '--jobs=4'):
+            result = self._run('hacking.standalone', jobs)
+            self.assertEqual(expected.returncode, result.returncode)
+            self.assertEqual(expected.stdout, result.stdout)
+
+    def test_syntax_error(self):
+        with open(os.path.join(self.directory, 'e.py'), 'w') as f:
+            f.write('def f(:\n')
+        # reported whichever codes are selected
+        expected = self._run('flake8', '--select=H,E999')
+        self.assertIn('./e.py:1:', expected.stdout)
+        result = self._run('hacking.standalone')
+        self.assertEqual(expected.stdout, result.stdout)
+
+    def test_select_ignore(self):
+        expected = self._run('flake8', '--select=H2', '--ignore=H201')
+        result = self._run('hacking.standalone', '--select=H2',
+                           '--ignore=H201')
+        self.assertEqual(expected.stdout, result.stdout)
+        self.assertIn('H202', result.stdout)
+        self.assertNotIn('H201', result.stdout)
+
+    def test_no_problems(self):
+        result = self._run('hacking.standalone', '--select=H105')
+        self.assertEqual(0, result.returncode)
+        self.assertEqual('', result.stdout)
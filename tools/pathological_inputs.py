@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the regex based checks on pathological logical lines.
+
+The checks must take time linear in the length of the logical line. Each
+check is run on a line and on the same line made eight times longer: linear
+matching makes the second run about eight times slower, anything quadratic
+about sixty four times. Exits with 1 if any check looks slower than linear,
+or is too fast on the shorter line for the case to measure anything.
+
+Run with ``tox -e pathological``.
+"""
+
+import sys
+import time
+
+from hacking.checks import except_checks
+from hacking.checks import other
+
+SIZE = 20000
+FACTOR = 8
+# Below this, a check does not go through the line and the case measures
+# nothing
+MIN_TIME = 1e-4
+
+CASES = (
+    (except_checks.hacking_assert_true_instance,
+     'self.assertTrue(isinstance(%s', 'a'),
+    (except_checks.hacking_assert_equal_type,
+     'self.assertEqual(type(%s', 'a.'),
+    (except_checks.hacking_assert_true_or_false_with_in,
+     'self.assertTrue(a in [%s', "'x', "),
+    (except_checks.hacking_assert_true_or_false_with_in,
+     'self.assertFalse(a not in %s', 'b,'),
+    (except_checks.hacking_assert_equal_in,
+     'self.assertEqual(a in %s', 'b, '),
+    (except_checks.hacking_assert_equal_in,
+     'self.assertEqual(True, a in %s', "'b', "),
+    # H904 stops at the first comma outside of a string, so a dict literal
+    # is only gone through up to its first item: make that item huge.
+    (other.hacking_delayed_string_interpolation,
+     'LOG.info("%%s" %% {"key": %s})', "'value' ", None),
+    (other.hacking_delayed_string_interpolation,
+     'LOG.debug(%s)', "'x ", None),
+)
+
+
+def _best_time(check, line, *args):
+    best = None
+    for _ in range(3):
+        # only time the scan, not the lookup of its last result
+        except_checks.scan_line.cache_clear()
+        start = time.perf_counter()
+        list(check(line, *args))
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    failed = False
+    for check, template, chunk, *args in CASES:
+        line = template % (chunk * SIZE)
+        long_line = template % (chunk * SIZE * FACTOR)
+
+        elapsed = _best_time(check, line, *args)
+        if elapsed < MIN_TIME:
+            print('%-40s %-32r too fast to measure' % (check.__name__,
+                                                       template))
+            failed = True
+            continue
+        ratio = _best_time(check, long_line, *args) / elapsed
+        print('%-40s %-32r x%.1f' % (check.__name__, template, ratio))
+        if ratio > FACTOR * 4:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())